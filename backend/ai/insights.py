@@ -1,21 +1,92 @@
 import os
-import json
+import time
+import asyncio
+import hashlib
 import logging
-from typing import List, Dict, Any, Optional
+import tempfile
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator
+from collections import Counter
 import httpx
-from datetime import datetime
+import orjson
+import tiktoken
+import numpy as np
+from datetime import datetime, timedelta
+from starlette.concurrency import run_in_threadpool
 
 from models.project import Project
 
 logger = logging.getLogger(__name__)
 
+# Refuse to load a persisted cache file larger than this
+MAX_CACHE_FILE_BYTES = 1024 * 1024
+
+# Token budget for the data summary sent to the LLM
+MAX_INPUT_TOKENS = int(os.getenv("AI_INSIGHTS_MAX_INPUT_TOKENS", 3000))
+
+# Seconds to wait before retrying a tokenizer that failed to load
+ENCODING_RETRY_DELAY = 60
+
+# Loaded tokenizers, and when a failed one may be tried again
+_encodings: Dict[str, Any] = {}
+_encoding_retry_at: Dict[str, float] = {}
+
+def _get_encoding(model: str):
+    """Load and cache the tokenizer for a model, or None while it can't be loaded"""
+    encoding = _encodings.get(model)
+    if encoding is not None:
+        return encoding
+    
+    # Loading may fetch the BPE file over the network, so back off between failures
+    if time.monotonic() < _encoding_retry_at.get(model, 0.0):
+        return None
+    
+    try:
+        encoding = tiktoken.encoding_for_model(model)
+    except Exception as e:
+        if model not in _encoding_retry_at:
+            logger.warning(
+                f"Could not load tokenizer for {model}, estimating tokens from text length "
+                f"and retrying every {ENCODING_RETRY_DELAY}s: {str(e)}"
+            )
+        _encoding_retry_at[model] = time.monotonic() + ENCODING_RETRY_DELAY
+        return None
+    
+    if _encoding_retry_at.pop(model, None) is not None:
+        logger.info(f"Loaded tokenizer for {model}")
+    _encodings[model] = encoding
+    return encoding
+
 class AIInsightsGenerator:
-    def __init__(self):
+    def __init__(self, cache_file: Optional[str] = None):
         self.api_key = os.getenv("OPENROUTER_API_KEY")
         self.api_url = "https://openrouter.ai/api/v1/chat/completions"
         self.model = "openai/gpt-4o"
         self.system_prompt = self._get_default_system_prompt()
         
+        # Cache of generated insights keyed by project-set fingerprint, as
+        # (expires_at, result)
+        self.cache_ttl = float(os.getenv("AI_INSIGHTS_CACHE_TTL", 300))
+        self._cache: Dict[bytes, Tuple[float, Dict[str, Any]]] = {}
+        
+        # The latest result is persisted so a restart followed by a re-scrape
+        # of unchanged data (same fingerprint) is served without an LLM call;
+        # scrapes take minutes, so it outlives the in-memory TTL
+        self.cache_file = cache_file
+        self.persist_ttl = float(os.getenv("AI_INSIGHTS_PERSIST_TTL", 86400))
+        
+        # Pending generations, so identical concurrent requests share one LLM call
+        self._inflight: Dict[bytes, asyncio.Task] = {}
+        
+        # Shared client so keep-alive connections are reused across calls
+        self._client = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10)
+        )
+        
+        # Cap concurrent upstream calls to stay clear of OpenRouter rate limits
+        self._semaphore = asyncio.Semaphore(int(os.getenv("OPENROUTER_MAX_CONCURRENCY", 4)))
+        
     def _get_default_system_prompt(self) -> str:
         """Default system prompt for market analysis"""
         return """You are a real estate market analyst with expertise in Israeli property markets. 
@@ -54,17 +125,40 @@ class AIInsightsGenerator:
                 }
             }
         
+        # Use custom prompt if provided, otherwise use default
+        system_prompt = custom_prompt or self.system_prompt
+        
+        # Serve repeated requests for the same data from cache; hashing walks
+        # every project, so it runs off the event loop like the summary
+        fingerprint = await run_in_threadpool(self._fingerprint, projects, system_prompt)
+        cached = self._get_cached(fingerprint)
+        if cached:
+            return cached
+        
+        # Piggy-back on an identical generation that is already running. The
+        # generation is its own task and every caller waits through a shield,
+        # so a cancelled request neither aborts the LLM call nor fails the others
+        task = self._inflight.get(fingerprint)
+        if task is None:
+            task = asyncio.create_task(self._run_analysis(projects, system_prompt, fingerprint))
+            self._inflight[fingerprint] = task
+            task.add_done_callback(lambda _: self._inflight.pop(fingerprint, None))
+        
+        return await asyncio.shield(task)
+    
+    async def _run_analysis(self,
+                            projects: List[Project],
+                            system_prompt: str,
+                            fingerprint: bytes) -> Dict[str, Any]:
+        """Summarize the projects, call the LLM and cache the result"""
         try:
-            # Prepare data summary for analysis
-            data_summary = self._prepare_data_summary(projects)
-            
-            # Use custom prompt if provided, otherwise use default
-            system_prompt = custom_prompt or self.system_prompt
+            # Prepare data summary off the event loop since it is CPU-bound
+            data_summary = await run_in_threadpool(self._prepare_data_summary, projects)
             
             # Generate insights using LLM
             insights = await self._call_llm(system_prompt, data_summary)
             
-            return {
+            result = {
                 "success": True,
                 "insights": insights,
                 "metadata": {
@@ -73,6 +167,9 @@ class AIInsightsGenerator:
                     "model_used": self.model
                 }
             }
+            await self._store_result(fingerprint, result)
+            
+            return result
             
         except Exception as e:
             logger.error(f"Error generating AI insights: {str(e)}")
@@ -82,88 +179,215 @@ class AIInsightsGenerator:
                 "insights": "Unable to generate insights due to technical error."
             }
     
+    async def stream_insights(self,
+                              projects: List[Project],
+                              custom_prompt: Optional[str] = None) -> AsyncIterator[str]:
+        """Stream AI-powered market insights token by token"""
+        
+        if not self.api_key:
+            logger.warning("OpenRouter API key not found. AI insights disabled.")
+            yield "AI insights are currently unavailable. Please configure OPENROUTER_API_KEY."
+            return
+        
+        if not projects:
+            yield "No project data available for analysis."
+            return
+        
+        system_prompt = custom_prompt or self.system_prompt
+        
+        # A cached result is replayed as a single chunk
+        fingerprint = await run_in_threadpool(self._fingerprint, projects, system_prompt)
+        cached = self._get_cached(fingerprint)
+        if cached and cached.get("success"):
+            yield cached["insights"]
+            return
+        
+        data_summary = await run_in_threadpool(self._prepare_data_summary, projects)
+        
+        tokens = []
+        async for token in self._stream_llm(system_prompt, data_summary):
+            tokens.append(token)
+            yield token
+        
+        # Cache the full completion so the buffered endpoint can reuse it
+        await self._store_result(fingerprint, {
+            "success": True,
+            "insights": "".join(tokens),
+            "metadata": {
+                "projects_analyzed": len(projects),
+                "generated_at": datetime.now().isoformat(),
+                "model_used": self.model
+            }
+        })
+    
+    def _fingerprint(self, projects: List[Project], system_prompt: str) -> bytes:
+        """Build a cache key from the project data and prompt used for analysis"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(system_prompt.encode())
+        digest.update(str(len(projects)).encode())
+        
+        for project in projects:
+            digest.update(
+                f"\n{project.project_name}|{project.developer_name}|{project.address}|"
+                f"{project.city}|{sorted(project.unit_prices.items())}|{len(project.transactions)}|"
+                f"{project.data_confidence_score}|{','.join(project.sources)}".encode()
+            )
+        
+        return digest.digest()
+    
+    def clear_cache(self):
+        """Drop all cached insights"""
+        self._cache.clear()
+    
+    def _get_cached(self, fingerprint: bytes) -> Optional[Dict[str, Any]]:
+        """Cached result for a fingerprint, dropping it if it has expired"""
+        cached = self._cache.get(fingerprint)
+        if cached is None:
+            return None
+        if time.time() >= cached[0]:
+            del self._cache[fingerprint]
+            return None
+        return cached[1]
+    
+    async def _store_result(self, fingerprint: bytes, result: Dict[str, Any]):
+        """Cache a successful result in memory and persist it to disk"""
+        generated_at = time.time()
+        
+        # Evict expired entries so the TTL bounds memory, not just freshness
+        self._cache = {
+            key: entry for key, entry in self._cache.items()
+            if generated_at < entry[0]
+        }
+        self._cache[fingerprint] = (generated_at + self.cache_ttl, result)
+        
+        if self.cache_file:
+            try:
+                await run_in_threadpool(self._write_cache_file, fingerprint, generated_at, result)
+            except OSError as e:
+                logger.warning(f"Could not persist AI insights cache: {str(e)}")
+    
+    def _write_cache_file(self, fingerprint: bytes, generated_at: float, result: Dict[str, Any]):
+        """Atomically write the latest result to the cache file"""
+        data = orjson.dumps({
+            "fingerprint": fingerprint.hex(),
+            "generated_at": generated_at,
+            "result": result
+        })
+        
+        # Unique temp file per write, so concurrent stores can't clobber each other
+        with tempfile.NamedTemporaryFile(
+            dir=os.path.dirname(self.cache_file) or ".",
+            prefix=f"{os.path.basename(self.cache_file)}.",
+            suffix=".tmp",
+            delete=False
+        ) as f:
+            f.write(data)
+        try:
+            os.replace(f.name, self.cache_file)
+        except OSError:
+            os.unlink(f.name)
+            raise
+    
+    def load_cache(self):
+        """Warm the in-memory cache from the persisted cache file"""
+        if not self.cache_file:
+            return
+        
+        try:
+            if os.path.getsize(self.cache_file) > MAX_CACHE_FILE_BYTES:
+                logger.warning("AI insights cache file too large, ignoring")
+                return
+            
+            with open(self.cache_file, "rb") as f:
+                data = orjson.loads(f.read())
+            
+            expires_at = data["generated_at"] + self.persist_ttl
+            if time.time() >= expires_at:
+                logger.info("Persisted AI insights cache expired, ignoring")
+                return
+            
+            self._cache[bytes.fromhex(data["fingerprint"])] = (expires_at, data["result"])
+            logger.info("Loaded persisted AI insights cache")
+            
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Could not load AI insights cache: {str(e)}")
+    
     def _prepare_data_summary(self, projects: List[Project]) -> str:
         """Prepare a structured summary of project data for LLM analysis"""
         
-        # Calculate aggregate statistics
         total_projects = len(projects)
-        total_transactions = sum(len(p.transactions) for p in projects)
         
-        # Price statistics
-        all_prices = []
-        for project in projects:
-            if project.unit_prices.get('avg', 0) > 0:
-                all_prices.append(project.unit_prices['avg'])
+        # Numeric columns are extracted once and aggregated in NumPy
+        transaction_counts = np.fromiter(
+            (len(p.transactions) for p in projects), dtype=np.int64, count=total_projects
+        )
+        prices = np.fromiter(
+            (p.unit_prices.get('avg', 0) for p in projects), dtype=np.float64, count=total_projects
+        )
+        confidences = np.fromiter(
+            (p.data_confidence_score for p in projects), dtype=np.float64, count=total_projects
+        )
+        timestamps = np.fromiter(
+            (p.last_updated.timestamp() for p in projects), dtype=np.float64, count=total_projects
+        )
         
-        avg_price = sum(all_prices) / len(all_prices) if all_prices else 0
-        min_price = min(all_prices) if all_prices else 0
-        max_price = max(all_prices) if all_prices else 0
+        total_transactions = int(transaction_counts.sum())
         
-        # Confidence statistics
-        confidence_scores = [p.data_confidence_score for p in projects if p.data_confidence_score > 0]
-        avg_confidence = sum(confidence_scores) / len(confidence_scores) if confidence_scores else 0
+        # Price statistics
+        prices = prices[prices > 0]
+        price_count = len(prices)
+        avg_price = prices.mean() if price_count else 0
+        min_price = prices.min() if price_count else 0
+        max_price = prices.max() if price_count else 0
         
-        # City distribution
-        city_counts = {}
-        for project in projects:
-            city = project.city or "Unknown"
-            city_counts[city] = city_counts.get(city, 0) + 1
+        # Confidence statistics
+        confidences = confidences[confidences > 0]
+        avg_confidence = confidences.mean() if len(confidences) else 0
+        high_confidence = int((confidences > 0.8).sum())
+        medium_confidence = int(((confidences >= 0.6) & (confidences <= 0.8)).sum())
+        low_confidence = int((confidences < 0.6).sum())
         
-        # Developer analysis
-        developer_counts = {}
-        for project in projects:
-            dev = project.developer_name or "Unknown"
-            developer_counts[dev] = developer_counts.get(dev, 0) + 1
+        # Recent projects (last 30 days)
+        recent_cutoff = (datetime.now() - timedelta(days=30)).timestamp()
+        recent_count = int((timestamps > recent_cutoff).sum())
         
-        # Data source analysis
-        source_counts = {}
+        # City, developer and source distributions
+        city_counts = Counter()
+        developer_counts = Counter()
+        source_counts = Counter()
         for project in projects:
-            for source in project.sources:
-                source_counts[source] = source_counts.get(source, 0) + 1
-        
-        # Recent projects (last 30 days)
-        recent_cutoff = datetime.now().timestamp() - (30 * 24 * 60 * 60)
-        recent_projects = [
-            p for p in projects 
-            if p.last_updated.timestamp() > recent_cutoff
-        ]
+            city_counts[project.city or "Unknown"] += 1
+            developer_counts[project.developer_name or "Unknown"] += 1
+            source_counts.update(project.sources)
         
         # Build comprehensive summary
-        summary = f"""
+        overview = f"""
 REAL ESTATE MARKET DATA ANALYSIS
 
 OVERVIEW:
 - Total Projects: {total_projects}
 - Total Transactions: {total_transactions}
-- Recent Projects (30 days): {len(recent_projects)}
+- Recent Projects (30 days): {recent_count}
 
 PRICE ANALYSIS:
 - Average Unit Price: ₪{avg_price:,.0f}
 - Price Range: ₪{min_price:,.0f} - ₪{max_price:,.0f}
-- Projects with Price Data: {len(all_prices)}
+- Projects with Price Data: {price_count}
 
 DATA QUALITY:
 - Average Confidence Score: {avg_confidence:.2%}
-- High Confidence Projects (>80%): {len([s for s in confidence_scores if s > 0.8])}
-- Medium Confidence Projects (60-80%): {len([s for s in confidence_scores if 0.6 <= s <= 0.8])}
-- Low Confidence Projects (<60%): {len([s for s in confidence_scores if s < 0.6])}
-
-GEOGRAPHIC DISTRIBUTION:
-{self._format_dict_summary(city_counts, "Cities")}
-
-TOP DEVELOPERS:
-{self._format_dict_summary(developer_counts, "Developers", limit=10)}
-
-DATA SOURCES:
-{self._format_dict_summary(source_counts, "Sources")}
-
-SAMPLE PROJECTS:
+- High Confidence Projects (>80%): {high_confidence}
+- Medium Confidence Projects (60-80%): {medium_confidence}
+- Low Confidence Projects (<60%): {low_confidence}
 """
         
         # Add sample project details
+        samples = ["\nSAMPLE PROJECTS:\n"]
         sample_projects = projects[:5]  # First 5 projects as samples
         for i, project in enumerate(sample_projects, 1):
-            summary += f"""
+            samples.append(f"""
 {i}. {project.project_name}
    - Developer: {project.developer_name or 'Unknown'}
    - Location: {project.address}, {project.city}
@@ -171,24 +395,56 @@ SAMPLE PROJECTS:
    - Transactions: {len(project.transactions)}
    - Confidence: {project.data_confidence_score:.1%}
    - Sources: {', '.join(project.sources)}
-"""
+""")
+        
+        summary = overview + self._format_distributions(city_counts, developer_counts, source_counts) + "".join(samples)
+        
+        # Keep the prompt within budget: drop samples first, then shorten the lists
+        if self._count_tokens(summary) > MAX_INPUT_TOKENS:
+            summary = overview + self._format_distributions(city_counts, developer_counts, source_counts)
+        if self._count_tokens(summary) > MAX_INPUT_TOKENS:
+            summary = overview + self._format_distributions(city_counts, developer_counts, source_counts, limit=3)
         
         return summary
     
-    def _format_dict_summary(self, data_dict: Dict[str, int], title: str, limit: int = 5) -> str:
-        """Format dictionary data for summary"""
+    def _format_distributions(self,
+                              city_counts: Counter,
+                              developer_counts: Counter,
+                              source_counts: Counter,
+                              limit: Optional[int] = None) -> str:
+        """Format the city, developer and source distribution sections"""
+        return f"""
+GEOGRAPHIC DISTRIBUTION:
+{self._format_dict_summary(city_counts, "Cities", limit=limit or 5)}
+
+TOP DEVELOPERS:
+{self._format_dict_summary(developer_counts, "Developers", limit=limit or 10)}
+
+DATA SOURCES:
+{self._format_dict_summary(source_counts, "Sources", limit=limit or 5)}
+"""
+    
+    def _count_tokens(self, text: str) -> int:
+        """Count prompt tokens for the configured model"""
+        encoding = _get_encoding(self.model.split("/")[-1])
+        if encoding is None:
+            # Rough estimate when no tokenizer is available
+            return len(text) // 4
+        return len(encoding.encode(text))
+    
+    def _format_dict_summary(self, data_dict: Counter, title: str, limit: int = 5) -> str:
+        """Format counter data for summary"""
         if not data_dict:
             return f"- No {title.lower()} data available"
         
-        sorted_items = sorted(data_dict.items(), key=lambda x: x[1], reverse=True)[:limit]
         formatted = []
-        for key, count in sorted_items:
+        for key, count in data_dict.most_common(limit):
             formatted.append(f"- {key}: {count}")
         
         return "\n".join(formatted)
     
-    async def _call_llm(self, system_prompt: str, data_summary: str) -> str:
-        """Make API call to OpenRouter LLM"""
+    def _build_request(self, system_prompt: str, data_summary: str, stream: bool = False) -> Tuple[Dict[str, str], Dict[str, Any]]:
+        """Build headers and payload for an OpenRouter chat completion"""
         
         headers = {
             "Authorization": f"Bearer {self.api_key}",
@@ -216,20 +472,59 @@ SAMPLE PROJECTS:
             "max_tokens": 2000
         }
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(self.api_url, headers=headers, json=payload)
-            response.raise_for_status()
-            
-            result = response.json()
+        if stream:
+            payload["stream"] = True
+        
+        return headers, payload
+    
+    async def _call_llm(self, system_prompt: str, data_summary: str) -> str:
+        """Make API call to OpenRouter LLM"""
+        
+        headers, payload = self._build_request(system_prompt, data_summary)
+        
+        async with self._semaphore:
+            response = await self._client.post(self.api_url, headers=headers, content=orjson.dumps(payload))
+        response.raise_for_status()
+        
+        result = response.json()
+        
+        if "choices" in result and len(result["choices"]) > 0:
+            return result["choices"][0]["message"]["content"]
+        else:
+            raise Exception("No response content from LLM")
+    
+    async def _stream_llm(self, system_prompt: str, data_summary: str) -> AsyncIterator[str]:
+        """Stream completion tokens from OpenRouter as they are generated"""
+        
+        headers, payload = self._build_request(system_prompt, data_summary, stream=True)
+        
+        async with self._semaphore:
+            async with self._client.stream("POST", self.api_url, headers=headers, content=orjson.dumps(payload)) as response:
+                response.raise_for_status()
             
-            if "choices" in result and len(result["choices"]) > 0:
-                return result["choices"][0]["message"]["content"]
-            else:
-                raise Exception("No response content from LLM")
+                async for line in response.aiter_lines():
+                    # Skip keep-alive comments and blank separator lines
+                    if not line.startswith("data:"):
+                        continue
+                
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                
+                    chunk = orjson.loads(data)
+                    if chunk.get("choices"):
+                        token = chunk["choices"][0].get("delta", {}).get("content")
+                        if token:
+                            yield token
+    
+    async def aclose(self):
+        """Close the shared HTTP client"""
+        await self._client.aclose()
     
     def update_system_prompt(self, new_prompt: str):
         """Update the system prompt for customized analysis"""
         self.system_prompt = new_prompt
+        self.clear_cache()
         logger.info("System prompt updated for AI insights")
     
     def get_system_prompt(self) -> str:
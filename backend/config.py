@@ -11,6 +11,8 @@ class Config:
     # Scraping Configuration
     SCRAPE_DELAY = float(os.getenv("SCRAPE_DELAY", 2.0))
     MAX_RETRIES = int(os.getenv("MAX_RETRIES", 3))
+    SCRAPE_CONCURRENCY = int(os.getenv("SCRAPE_CONCURRENCY", 8))
+    SCRAPE_RATE_LIMIT = float(os.getenv("SCRAPE_RATE_LIMIT", 4.0))
     USER_AGENT = os.getenv("USER_AGENT", "MarketSurveyBot/1.0")
     
     # Data Sources
@@ -20,6 +22,7 @@ class Config:
     # Storage
     DATA_DIR = os.getenv("DATA_DIR", "./data")
     JSON_OUTPUT_DIR = os.path.join(DATA_DIR, "json")
+    INSIGHTS_CACHE_FILE = os.path.join(JSON_OUTPUT_DIR, "insights_cache.json")
     
     # Matching Configuration
     ADDRESS_MATCH_THRESHOLD = float(os.getenv("ADDRESS_MATCH_THRESHOLD", 0.85))
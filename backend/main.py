@@ -1,16 +1,20 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
 import logging
 import asyncio
+import orjson
+from collections import deque
 from typing import List, Optional
 from datetime import datetime
 import os
 
 from scrapers.madlan_scraper import MadlanScraper
 from scrapers.tax_scraper import TaxAuthorityScraper
+from scrapers.browser_pool import BrowserPool
 from matchers.address_matcher import AddressMatcher
 from models.project import Project, ScrapeStatus
+from models.project_store import ProjectStore
 from config import Config
 from ai.insights import AIInsightsGenerator
 
@@ -25,7 +29,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Market Survey System API",
     description="Real estate data extraction and intelligence API",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
@@ -39,14 +44,28 @@ app.add_middleware(
 
 # Initialize components
 config = Config()
-madlan_scraper = MadlanScraper()
-tax_scraper = TaxAuthorityScraper()
+browser_pool = BrowserPool()
+madlan_scraper = MadlanScraper(pool=browser_pool)
+tax_scraper = TaxAuthorityScraper(pool=browser_pool)
 address_matcher = AddressMatcher()
-ai_insights = AIInsightsGenerator()
+ai_insights = AIInsightsGenerator(cache_file=config.INSIGHTS_CACHE_FILE)
 
 # In-memory storage (replace with database in production)
-projects_store = []
-scrape_statuses = []
+projects_store = ProjectStore()
+scrape_statuses = deque(maxlen=100)
+
+# Scrape jobs are run one at a time by a worker; pending jobs are de-duplicated
+scrape_queue: asyncio.Queue = asyncio.Queue()
+pending_scrapes = set()
+scrape_worker_task: Optional[asyncio.Task] = None
+
+# Accepted scrape parameters
+SCRAPE_CITIES = ("tel-aviv", "jerusalem", "haifa", "beer-sheva", "ashdod", "ashkelon")
+SCRAPE_SOURCES = ("madlan", "tax", "all")
+_VALID_CITIES = frozenset(SCRAPE_CITIES)
+_VALID_SOURCES = frozenset(SCRAPE_SOURCES)
+_CITIES_MSG = f"Invalid city. Must be one of: {', '.join(SCRAPE_CITIES)}"
+_SOURCES_MSG = f"Invalid source. Must be one of: {', '.join(SCRAPE_SOURCES)}"
 
 @app.get("/")
 async def root():
@@ -70,21 +89,12 @@ async def get_projects(
 ):
     """Get all projects with optional filtering"""
     
-    filtered_projects = projects_store
-    
-    if city:
-        filtered_projects = [p for p in filtered_projects 
-                           if city.lower() in p.city.lower()]
-    
-    if developer:
-        filtered_projects = [p for p in filtered_projects 
-                           if developer.lower() in (p.developer_name or "").lower()]
-    
-    if min_confidence is not None:
-        filtered_projects = [p for p in filtered_projects 
-                           if p.data_confidence_score >= min_confidence]
-    
-    return filtered_projects[:limit]
+    return projects_store.filter(
+        city=city,
+        developer=developer,
+        min_confidence=min_confidence,
+        limit=limit
+    )
 
 @app.get("/api/projects/{project_id}", response_model=Project)
 async def get_project(project_id: int):
@@ -96,38 +106,39 @@ async def get_project(project_id: int):
 
 @app.post("/api/scrape")
 async def trigger_scrape(
-    background_tasks: BackgroundTasks,
     city: str = "tel-aviv",
     source: str = "all"
 ):
     """Trigger scraping for new data"""
     
     # Validate inputs
-    valid_cities = ["tel-aviv", "jerusalem", "haifa", "beer-sheva", "ashdod", "ashkelon"]
-    valid_sources = ["madlan", "tax", "all"]
+    if city not in _VALID_CITIES:
+        raise HTTPException(status_code=400, detail=_CITIES_MSG)
     
-    if city not in valid_cities:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"Invalid city. Must be one of: {', '.join(valid_cities)}"
-        )
+    if source not in _VALID_SOURCES:
+        raise HTTPException(status_code=400, detail=_SOURCES_MSG)
     
-    if source not in valid_sources:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"Invalid source. Must be one of: {', '.join(valid_sources)}"
-        )
+    job = (city, source)
+    if job in pending_scrapes:
+        return {
+            "message": "Scraping task already queued",
+            "city": city,
+            "source": source,
+            "status_endpoint": "/api/status"
+        }
     
     try:
-        background_tasks.add_task(run_scraping_task, city, source)
+        pending_scrapes.add(job)
+        await scrape_queue.put(job)
         
         return {
-            "message": "Scraping task started",
+            "message": "Scraping task queued",
             "city": city,
             "source": source,
             "status_endpoint": "/api/status"
         }
     except Exception as e:
+        pending_scrapes.discard(job)
         logger.error(f"Error starting scraping task: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to start scraping task")
 
@@ -144,8 +155,20 @@ async def export_data(format: str = "json"):
     """Export all project data"""
     
     if format.lower() == "json":
-        return JSONResponse(
-            content=[project.dict() for project in projects_store],
+        # Snapshot the store so a concurrent scrape can't change it mid-stream
+        projects = list(projects_store)
+        
+        async def generate():
+            yield b"["
+            for i, project in enumerate(projects):
+                if i:
+                    yield b","
+                yield project.model_dump_json().encode()
+            yield b"]"
+        
+        return StreamingResponse(
+            generate(),
+            media_type="application/json",
             headers={"Content-Disposition": "attachment; filename=projects.json"}
         )
     else:
@@ -154,8 +177,8 @@ async def export_data(format: str = "json"):
 @app.delete("/api/projects")
 async def clear_projects():
     """Clear all stored projects (for testing)"""
-    global projects_store
     projects_store.clear()
+    ai_insights.clear_cache()
     return {"message": "All projects cleared"}
 
 @app.get("/api/ai-insights")
@@ -172,13 +195,29 @@ async def get_ai_insights():
                 }
             }
         
-        insights_result = await ai_insights.generate_insights(projects_store)
+        insights_result = await ai_insights.generate_insights(list(projects_store))
         return insights_result
         
     except Exception as e:
         logger.error(f"Error generating AI insights: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to generate insights")
 
+@app.get("/api/ai-insights/stream")
+async def stream_ai_insights():
+    """Stream AI-powered market insights as server-sent events"""
+    projects = list(projects_store)
+    
+    async def generate():
+        try:
+            async for token in ai_insights.stream_insights(projects):
+                yield b"data: " + orjson.dumps({"token": token}) + b"\n\n"
+        except Exception as e:
+            logger.error(f"Error streaming AI insights: {str(e)}")
+            yield b"data: " + orjson.dumps({"error": "Failed to generate insights"}) + b"\n\n"
+        yield b"data: [DONE]\n\n"
+    
+    return StreamingResponse(generate(), media_type="text/event-stream")
+
 @app.get("/api/ai-insights/prompt")
 async def get_system_prompt():
     """Get the current system prompt for AI insights"""
@@ -208,7 +247,7 @@ async def update_system_prompt(request: Request):
         raise HTTPException(status_code=500, detail="Failed to update system prompt")
 
 async def run_scraping_task(city: str, source: str):
-    """Background task for scraping data"""
+    """Scrape, match and store data for a single queued job"""
     
     status = ScrapeStatus(
         source=source,
@@ -219,34 +258,38 @@ async def run_scraping_task(city: str, source: str):
     try:
         logger.info(f"Starting scrape for city: {city}, source: {source}")
         
-        # Initialize scrapers
-        projects = []
-        transactions = []
+        # Madlan and the Tax Authority are independent, so scrape them concurrently
+        scrapes = {}
         
-        # Scrape based on source
         if source in ["madlan", "all"]:
-            try:
-                logger.info("Scraping Madlan...")
-                madlan_projects = await madlan_scraper.scrape_projects(city)
-                projects.extend(madlan_projects)
-                logger.info(f"Found {len(madlan_projects)} projects from Madlan")
-            except Exception as e:
-                error_msg = f"Madlan scraping failed: {str(e)}"
-                logger.error(error_msg)
-                status.errors.append(error_msg)
+            logger.info("Scraping Madlan...")
+            scrapes["Madlan"] = madlan_scraper.scrape_projects(city)
         
         if source in ["tax", "all"]:
-            try:
-                logger.info("Scraping Tax Authority...")
-                tax_transactions = await tax_scraper.scrape_transactions(
-                    city.replace('-', ' ').title()
-                )
-                transactions.extend(tax_transactions)
-                logger.info(f"Found {len(tax_transactions)} transactions from Tax Authority")
-            except Exception as e:
-                error_msg = f"Tax Authority scraping failed: {str(e)}"
+            logger.info("Scraping Tax Authority...")
+            scrapes["Tax Authority"] = tax_scraper.scrape_transactions(
+                city.replace('-', ' ').title()
+            )
+        
+        results = dict(zip(
+            scrapes,
+            await asyncio.gather(*scrapes.values(), return_exceptions=True)
+        ))
+        
+        projects = []
+        transactions = []
+        
+        for name, result in results.items():
+            if isinstance(result, Exception):
+                error_msg = f"{name} scraping failed: {str(result)}"
                 logger.error(error_msg)
                 status.errors.append(error_msg)
+            elif name == "Madlan":
+                projects.extend(result)
+                logger.info(f"Found {len(result)} projects from Madlan")
+            else:
+                transactions.extend(result)
+                logger.info(f"Found {len(result)} transactions from Tax Authority")
         
         # Match transactions with projects
         if projects and transactions:
@@ -262,9 +305,9 @@ async def run_scraping_task(city: str, source: str):
                 logger.error(error_msg)
                 status.errors.append(error_msg)
         
-        # Update global store
-        global projects_store
-        projects_store = projects
+        # Merge into the global store, keeping unchanged projects as they are
+        added, updated = projects_store.merge(projects)
+        logger.info(f"Store updated: {added} new projects, {updated} changed")
         
         # Update status
         if status.errors:
@@ -283,6 +326,18 @@ async def run_scraping_task(city: str, source: str):
     finally:
         scrape_statuses.append(status)
 
+async def scrape_worker():
+    """Run queued scraping jobs one after another"""
+    while True:
+        city, source = await scrape_queue.get()
+        try:
+            await run_scraping_task(city, source)
+        except Exception as e:
+            logger.error(f"Scrape worker error: {str(e)}")
+        finally:
+            pending_scrapes.discard((city, source))
+            scrape_queue.task_done()
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize on startup"""
@@ -291,12 +346,25 @@ async def startup_event():
     # Ensure data directory exists
     os.makedirs(config.JSON_OUTPUT_DIR, exist_ok=True)
     
+    # Reuse insights generated before the last restart
+    ai_insights.load_cache()
+    
+    # Start the scrape job consumer
+    global scrape_worker_task
+    scrape_worker_task = asyncio.create_task(scrape_worker())
+    
     logger.info("API ready to serve requests")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("Market Survey System API shutting down...")
+    
+    if scrape_worker_task:
+        scrape_worker_task.cancel()
+    
+    await ai_insights.aclose()
+    await browser_pool.close()
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,126 +1,267 @@
-from typing import List, Tuple, Dict, Any
-from fuzzywuzzy import fuzz, process
+from typing import List, Tuple, Dict, Any, Optional
+from collections import defaultdict
+from rapidfuzz import fuzz, process
+from rapidfuzz.utils import default_process
+import numpy as np
 import re
-from difflib import SequenceMatcher
+from functools import lru_cache
 import logging
 
-from models.project import Project
+from models.project import Project, Transaction, DataSource
 from config import Config
 
 logger = logging.getLogger(__name__)
 
+# Most transactions attached to a single project per matching run
+MAX_MATCHES_PER_PROJECT = 10
+
+# Confidence weights for name, address, developer, coordinates, capped
+# transaction score, price data and multiple sources
+CONFIDENCE_WEIGHTS = (0.2, 0.2, 0.1, 0.1, 1.0, 0.1, 0.1)
+
+# Confidence added per matched transaction, and its cap
+TRANSACTION_CONFIDENCE = 0.05
+MAX_TRANSACTION_CONFIDENCE = 0.3
+
+# Weights and threshold for find_similar_projects
+ADDRESS_WEIGHT = 0.7
+DEVELOPER_WEIGHT = 0.3
+SIMILARITY_THRESHOLD = 0.7
+
+# How many building numbers either side of a project's number share its block
+BLOCK_NUMBER_SPAN = 2
+
+# Precompiled normalization patterns
+_RE_NONWORD = re.compile(r'[^\w\s]')
+_RE_WS = re.compile(r'\s+')
+_RE_NUMRANGE = re.compile(r'(\d+)(?:\s*[-–]\s*\d+)?')
+_RE_BLOCK_KEY = re.compile(r'(\D+?)\s*(\d+)')
+
+# Hebrew address pattern: optional street type, street, number, optional city
+_RE_ADDRESS_FORMAT = re.compile(r'^(?:רח|שד|דרך)?\s*([^\d]+)\s*(\d+(?:[א-ת])?)(?:\s*,\s*([^,]+))?$')
+
+# Hebrew street type abbreviations, applied in one pass with longest keys first
+_STREET_MAP = {
+    'רחוב': 'רח',
+    'שדרות': 'שד',
+    'דרך': 'דר',
+    'הרב': 'הרב',
+    'הרבנית': 'הרבנית',
+    'הגאון': 'הגאון',
+    'הגאונים': 'הגאונים'
+}
+_STREET_RE = re.compile('|'.join(re.escape(k) for k in sorted(_STREET_MAP, key=len, reverse=True)))
+
+# Addresses repeat heavily across projects, transactions and runs, so
+# normalization results are memoized
+@lru_cache(maxsize=100_000)
+def normalize_address(address: str) -> str:
+    """Normalize address for better matching"""
+    if not address:
+        return ""
+        
+    # Convert to lowercase
+    address = address.lower().strip()
+    
+    # Remove special characters and extra spaces
+    address = _RE_NONWORD.sub(' ', address)
+    address = _RE_WS.sub(' ', address)
+    
+    # Hebrew street type abbreviations
+    address = _STREET_RE.sub(lambda m: _STREET_MAP[m.group(0)], address)
+    
+    # Remove common prefixes
+    prefixes = ['רח ', 'שד ', 'דר ', 'הרב ', 'הרבנית ']
+    for prefix in prefixes:
+        if address.startswith(prefix):
+            address = address[len(prefix):]
+            break
+    
+    # Handle building numbers
+    address = _RE_NUMRANGE.sub(r'\1', address)
+    
+    return address.strip()
+
+@lru_cache(maxsize=100_000)
+def normalize_developer(name: str) -> str:
+    """Normalize developer name for comparison"""
+    return name.lower()
+
 class AddressMatcher:
     def __init__(self):
         self.config = Config()
         self.threshold = self.config.ADDRESS_MATCH_THRESHOLD
         
+        # Index of the last transaction list matched, reused while its length is unchanged
+        self._tx_cache: Optional[Tuple[List[Dict[str, Any]], int, Tuple]] = None
+        
     def match_projects_with_transactions(self, 
                                        projects: List[Project], 
                                        transactions: List[Dict[str, Any]]) -> List[Project]:
         """Match projects with transactions based on address similarity"""
         
-        # Create address index for faster matching
-        project_addresses = [(p, self._normalize_address(p.address)) for p in projects]
-        transaction_addresses = [(t, self._normalize_address(t['address'])) for t in transactions]
+        # Transaction lookups are reused while the same list is matched again
+        (transaction_addresses, processed_addresses, exact,
+         blocks, street_blocks, unblocked, scorable) = self._index_transactions(transactions)
         
-        matched_projects = []
+        project_addresses = [self._normalize_address(p.address) for p in projects]
+        
+        matches: List[np.ndarray] = [np.empty(0, dtype=np.intp)] * len(projects)
+        project_groups: Dict[Optional[Tuple[str, int]], List[int]] = defaultdict(list)
+        
+        # Identical normalized addresses are matched directly; the remaining
+        # projects are grouped by address block and each group is scored only
+        # against the transactions in nearby blocks
+        for i, address in enumerate(project_addresses):
+            exact_ids = exact.get(address)
+            if exact_ids:
+                matches[i] = np.array(exact_ids[:MAX_MATCHES_PER_PROJECT], dtype=np.intp)
+            else:
+                project_groups[self._blocking_key(address)].append(i)
         
-        for project, project_addr in project_addresses:
-            # Find matching transactions
-            matching_transactions = self._find_matching_transactions(
-                project_addr, 
-                transaction_addresses
+        for key, project_ids in project_groups.items():
+            candidates = self._candidate_transactions(
+                key, blocks, street_blocks, unblocked, scorable
+            )
+            
+            # Empty addresses would score as a perfect match against each other
+            queries = [(i, default_process(project_addresses[i])) for i in project_ids]
+            queries = [(i, query) for i, query in queries if query]
+            if not len(candidates) or not queries:
+                continue
+            
+            # Score the group in one multi-threaded call;
+            # pairs below the threshold come back as 0
+            scores = process.cdist(
+                [query for _, query in queries],
+                [processed_addresses[j] for j in candidates],
+                scorer=fuzz.partial_ratio,
+                processor=None,
+                score_cutoff=self.threshold,
+                dtype=np.uint8,
+                workers=-1
             )
             
+            for (i, _), row in zip(queries, scores):
+                matches[i] = candidates[self._best_matches(row)]
+        
+        matched_projects = []
+        
+        for project, match_ids in zip(projects, matches):
             # Add transactions to project
-            for transaction_data, score in matching_transactions:
-                if score >= self.threshold:
-                    transaction = self._create_transaction_from_data(transaction_data)
-                    project.transactions.append(transaction)
-                    
-                    # Update price range
-                    self._update_price_range(project, transaction.price)
-                    
-                    # Add ITA as source if not already present
-                    if 'ita' not in [s.value for s in project.sources]:
-                        project.sources.append('ita')
+            for idx in match_ids:
+                transaction = self._create_transaction_from_data(transactions[idx])
+                project.transactions.append(transaction)
+                
+                # Update price range
+                self._update_price_range(project, transaction.price)
             
-            # Recalculate confidence score
-            project.data_confidence_score = self._recalculate_confidence(project)
+            # Add ITA as source if not already present
+            if len(match_ids) and DataSource.TAX_AUTHORITY not in project.sources:
+                project.sources.append(DataSource.TAX_AUTHORITY)
             
             matched_projects.append(project)
+        
+        # Recalculate confidence scores for the whole batch
+        scores = self._recalculate_confidences(matched_projects)
+        for project, score in zip(matched_projects, scores.tolist()):
+            project.data_confidence_score = score
             
         return matched_projects
     
-    def _normalize_address(self, address: str) -> str:
-        """Normalize address for better matching"""
-        if not address:
-            return ""
-            
-        # Convert to lowercase
-        address = address.lower().strip()
-        
-        # Remove special characters and extra spaces
-        address = re.sub(r'[^\w\s]', ' ', address)
-        address = re.sub(r'\s+', ' ', address)
-        
-        # Hebrew street type abbreviations
-        street_types = {
-            'רחוב': 'רח',
-            'שדרות': 'שד',
-            'דרך': 'דר',
-            'הרב': 'הרב',
-            'הרבנית': 'הרבנית',
-            'הגאון': 'הגאון',
-            'הגאונים': 'הגאונים'
-        }
+    def _blocking_key(self, normalized_address: str) -> Optional[Tuple[str, int]]:
+        """Block an address by its first street token and building number"""
+        match = _RE_BLOCK_KEY.match(normalized_address)
+        if not match:
+            return None
+        return (match.group(1).split()[0], int(match.group(2)))
+    
+    def _index_transactions(self, transactions: List[Dict[str, Any]]) -> Tuple:
+        """Normalized addresses and lookup tables for a transaction list"""
+        cached = self._tx_cache
+        if cached is not None and cached[0] is transactions and cached[1] == len(transactions):
+            return cached[2]
+        
+        transaction_addresses = [self._normalize_address(t['address']) for t in transactions]
         
-        for full, abbr in street_types.items():
-            address = address.replace(full.lower(), abbr.lower())
+        # Preprocess once for rapidfuzz so cdist can run with processor=None
+        processed_addresses = [default_process(address) for address in transaction_addresses]
         
-        # Remove common prefixes
-        prefixes = ['רח ', 'שד ', 'דר ', 'הרב ', 'הרבנית ']
-        for prefix in prefixes:
-            if address.startswith(prefix):
-                address = address[len(prefix):]
-                break
+        exact: Dict[str, List[int]] = defaultdict(list)
+        for j, address in enumerate(transaction_addresses):
+            if address:
+                exact[address].append(j)
         
-        # Handle building numbers
-        address = re.sub(r'(\d+)(?:\s*[-–]\s*\d+)?', r'\1', address)
+        blocks, street_blocks, unblocked = self._block_transactions(transaction_addresses)
+        unblocked = [j for j in unblocked if processed_addresses[j]]
+        scorable = np.array([j for j, address in enumerate(processed_addresses) if address], dtype=np.intp)
         
-        return address.strip()
+        index = (transaction_addresses, processed_addresses, exact,
+                 blocks, street_blocks, unblocked, scorable)
+        
+        # Holding the list itself keeps its id from being reused by a new one
+        self._tx_cache = (transactions, len(transactions), index)
+        return index
     
-    def _find_matching_transactions(self, 
-                                  project_address: str, 
-                                  transaction_addresses: List[Tuple[Dict[str, Any], str]]) -> List[Tuple[Dict[str, Any], float]]:
-        """Find transactions that match the project address"""
+    def _block_transactions(self, transaction_addresses: List[str]) -> Tuple[Dict[Tuple[str, int], List[int]], Dict[str, List[int]], List[int]]:
+        """Bucket transaction indexes by blocking key and by street"""
+        blocks: Dict[Tuple[str, int], List[int]] = defaultdict(list)
+        street_blocks: Dict[str, List[int]] = defaultdict(list)
+        unblocked: List[int] = []
         
-        matches = []
+        for i, address in enumerate(transaction_addresses):
+            key = self._blocking_key(address)
+            if key is None:
+                unblocked.append(i)
+            else:
+                blocks[key].append(i)
+                street_blocks[key[0]].append(i)
         
-        # Use fuzzy matching for better results
-        transaction_strings = [addr for _, addr in transaction_addresses]
-        transaction_data = [data for data, _ in transaction_addresses]
+        return blocks, street_blocks, unblocked
+    
+    def _candidate_transactions(self,
+                                key: Optional[Tuple[str, int]],
+                                blocks: Dict[Tuple[str, int], List[int]],
+                                street_blocks: Dict[str, List[int]],
+                                unblocked: List[int],
+                                scorable: np.ndarray) -> np.ndarray:
+        """Transaction indexes worth scoring for projects with the given blocking key"""
+        if key is None:
+            return scorable
         
-        # Get best matches
-        best_matches = process.extract(
-            project_address, 
-            transaction_strings, 
-            scorer=fuzz.partial_ratio,
-            limit=10
-        )
+        # Nearby building numbers on the same street, since ranges like
+        # "10-14" normalize to their first number
+        street, number = key
+        ids = []
+        for offset in range(-BLOCK_NUMBER_SPAN, BLOCK_NUMBER_SPAN + 1):
+            ids.extend(blocks.get((street, number + offset), ()))
         
-        for match_str, score, idx in best_matches:
-            if score >= self.threshold:
-                transaction = transaction_data[idx]
-                matches.append((transaction, score))
+        # Widen to the whole street when no nearby building has transactions
+        if not ids:
+            ids = list(street_blocks.get(street, ()))
         
-        return matches
+        # Unparseable transaction addresses are always candidates
+        return np.array(sorted(ids + unblocked), dtype=np.intp)
     
-    def _create_transaction_from_data(self, transaction_data: Dict[str, Any]) -> Any:
-        """Create Transaction object from scraped data"""
-        from models.project import Transaction
+    def _best_matches(self, scores: np.ndarray) -> np.ndarray:
+        """Indexes of the best scoring transactions, highest score first"""
+        candidates = np.flatnonzero(scores)
         
-        return Transaction(
+        if len(candidates) > MAX_MATCHES_PER_PROJECT:
+            top = np.argpartition(scores[candidates], -MAX_MATCHES_PER_PROJECT)
+            candidates = candidates[top[-MAX_MATCHES_PER_PROJECT:]]
+        
+        order = np.argsort(-scores[candidates].astype(np.int16), kind='stable')
+        return candidates[order]
+    
+    def _normalize_address(self, address: str) -> str:
+        """Normalize address for better matching"""
+        return normalize_address(address)
+    
+    def _create_transaction_from_data(self, transaction_data: Dict[str, Any]) -> Transaction:
+        """Create Transaction object from scraped data"""
+        # Scraped rows are already typed, so skip pydantic validation
+        return Transaction.model_construct(
             price=transaction_data['price'],
             sale_date=transaction_data['sale_date'],
             unit_size=transaction_data.get('unit_size'),
@@ -130,72 +271,92 @@ class AddressMatcher:
     
     def _update_price_range(self, project: Project, new_price: int):
         """Update price range statistics with new transaction"""
-        prices = [t.price for t in project.transactions]
+        # Seed from the full list on the first update, or when the running
+        # totals don't cover every transaction (e.g. ones attached by the scraper)
+        if not project._price_count or project._price_count != len(project.transactions) - 1:
+            count = len(project.transactions)
+            if count:
+                prices = np.fromiter((t.price for t in project.transactions), dtype=np.int64, count=count)
+                project._price_sum = int(prices.sum())
+                project._price_count = count
+                project.unit_prices = {
+                    'min': int(prices.min()),
+                    'max': int(prices.max()),
+                    'avg': project._price_sum // project._price_count
+                }
+            return
         
-        if prices:
-            project.unit_prices = {
-                'min': min(prices),
-                'max': max(prices),
-                'avg': sum(prices) // len(prices)
-            }
+        project._price_sum += new_price
+        project._price_count += 1
+        
+        prices = project.unit_prices
+        prices['min'] = min(prices['min'], new_price)
+        prices['max'] = max(prices['max'], new_price)
+        prices['avg'] = project._price_sum // project._price_count
     
     def _recalculate_confidence(self, project: Project) -> float:
         """Recalculate confidence score based on data completeness"""
-        score = 0.0
-        
-        # Base score from required fields
-        if project.project_name:
-            score += 0.2
-        if project.address:
-            score += 0.2
-        if project.developer_name:
-            score += 0.1
-        if project.coordinates:
-            score += 0.1
-            
-        # Score from transactions
-        if project.transactions:
-            score += min(len(project.transactions) * 0.05, 0.3)
-            
-        # Score from price data
-        if project.unit_prices['min'] > 0:
-            score += 0.1
-            
-        # Multiple sources bonus
-        if len(project.sources) > 1:
-            score += 0.1
-            
-        return min(score, 1.0)
+        return float(self._recalculate_confidences([project])[0])
+    
+    def _recalculate_confidences(self, projects: List[Project]) -> np.ndarray:
+        """Recalculate confidence scores for a batch of projects"""
+        # Score from transactions, capped
+        transaction_scores = np.minimum(
+            np.fromiter((len(p.transactions) for p in projects), dtype=np.float64, count=len(projects))
+            * TRANSACTION_CONFIDENCE,
+            MAX_TRANSACTION_CONFIDENCE
+        )
+        
+        # One column per CONFIDENCE_WEIGHTS entry
+        columns = (
+            np.fromiter((bool(p.project_name) for p in projects), dtype=np.float64, count=len(projects)),
+            np.fromiter((bool(p.address) for p in projects), dtype=np.float64, count=len(projects)),
+            np.fromiter((bool(p.developer_name) for p in projects), dtype=np.float64, count=len(projects)),
+            np.fromiter((bool(p.coordinates) for p in projects), dtype=np.float64, count=len(projects)),
+            transaction_scores,
+            np.fromiter((p.unit_prices['min'] > 0 for p in projects), dtype=np.float64, count=len(projects)),
+            np.fromiter((len(p.sources) > 1 for p in projects), dtype=np.float64, count=len(projects))
+        )
+        
+        # Accumulate column by column in field order, so the result matches
+        # the per-project running sum exactly
+        scores = np.zeros(len(projects))
+        for column, weight in zip(columns, CONFIDENCE_WEIGHTS):
+            scores += column * weight
+        
+        return np.minimum(scores, 1.0)
     
     def find_similar_projects(self, projects: List[Project], 
                             target_project: Project) -> List[Tuple[Project, float]]:
         """Find similar projects based on address and developer"""
         
         target_addr = self._normalize_address(target_project.address)
-        target_dev = target_project.developer_name or ""
+        target_dev = normalize_developer(target_project.developer_name or "")
+        
+        others = [project for project in projects if project != target_project]
+        if not others:
+            return []
+        
+        # Score the target address against every other project in one batch
+        addr_scores = process.cdist(
+            [target_addr],
+            [self._normalize_address(project.address) for project in others],
+            scorer=fuzz.ratio,
+            dtype=np.float64,
+            workers=-1
+        )[0]
         
         similarities = []
         
-        for project in projects:
-            if project == target_project:
-                continue
-                
-            addr_sim = fuzz.ratio(
-                target_addr, 
-                self._normalize_address(project.address)
-            )
-            
+        for project, addr_sim in zip(others, addr_scores.tolist()):
             dev_sim = 0
             if target_dev and project.developer_name:
-                dev_sim = fuzz.ratio(
-                    target_dev.lower(), 
-                    project.developer_name.lower()
-                )
+                dev_sim = fuzz.ratio(target_dev, normalize_developer(project.developer_name))
             
             # Weighted similarity
-            total_sim = (addr_sim * 0.7) + (dev_sim * 0.3)
+            total_sim = (addr_sim * ADDRESS_WEIGHT) + (dev_sim * DEVELOPER_WEIGHT)
             
-            if total_sim >= 0.7:  # Similarity threshold
+            if total_sim >= SIMILARITY_THRESHOLD:
                 similarities.append((project, total_sim))
         
         # Sort by similarity score
@@ -216,9 +377,7 @@ class AddressMatcher:
         if not address:
             return result
             
-        # Hebrew address pattern
-        pattern = r'^(?:רח|שד|דרך)?\s*([^\d]+)\s*(\d+(?:[א-ת])?)(?:\s*,\s*([^,]+))?$'
-        match = re.match(pattern, address.strip())
+        match = _RE_ADDRESS_FORMAT.match(address.strip())
         
         if match:
             result.update({
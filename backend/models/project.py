@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from enum import Enum
@@ -54,6 +54,10 @@ class Project(BaseModel):
         description="Additional metadata like project status, construction year, etc."
     )
     
+    # Running totals behind unit_prices['avg'], kept in step with transactions
+    _price_sum: int = PrivateAttr(0)
+    _price_count: int = PrivateAttr(0)
+    
     class Config:
         json_encoders = {
             datetime: lambda v: v.isoformat()
@@ -0,0 +1,142 @@
+import bisect
+from typing import List, Dict, Optional, Set, Tuple, Iterator
+
+from models.project import Project
+
+# Fields ignored when deciding whether a re-scraped project changed
+_UNTRACKED_FIELDS = {"last_updated"}
+
+class ProjectStore:
+    """In-memory project storage with lookup indexes for filtered queries"""
+
+    def __init__(self, projects: Optional[List[Project]] = None):
+        self.replace(projects or [])
+
+    def __len__(self) -> int:
+        return len(self.projects)
+
+    def __iter__(self) -> Iterator[Project]:
+        return iter(self.projects)
+
+    def __getitem__(self, index):
+        return self.projects[index]
+
+    def replace(self, projects: List[Project]):
+        """Replace all stored projects and rebuild the indexes"""
+        self.projects = list(projects)
+        self._rebuild_indexes()
+
+    def clear(self):
+        """Remove all stored projects"""
+        self.replace([])
+
+    def merge(self, projects: List[Project]) -> Tuple[int, int]:
+        """Merge scraped projects into the store, returning (added, updated) counts"""
+        # Projects missing from a later scrape are kept on purpose, so the store
+        # holds every distinct project seen since the last clear(); its size is
+        # bounded by the listings scraped, not by the number of scrapes
+        added = 0
+        updated = 0
+
+        for project in projects:
+            key = self._project_key(project)
+            i = self._by_key.get(key)
+
+            if i is None:
+                self._by_key[key] = len(self.projects)
+                self.projects.append(project)
+                self._index_project(len(self.projects) - 1)
+                added += 1
+                continue
+
+            existing = self.projects[i]
+            if existing.model_dump(exclude=_UNTRACKED_FIELDS) == project.model_dump(exclude=_UNTRACKED_FIELDS):
+                continue
+
+            # Update in place so unchanged projects keep their identity and timestamp
+            self._unindex_project(i)
+            for field in existing.model_fields:
+                setattr(existing, field, getattr(project, field))
+            # Private state such as the running price totals must follow the
+            # transactions it was computed from
+            for attr in existing.__private_attributes__:
+                setattr(existing, attr, getattr(project, attr))
+            self._index_project(i)
+            updated += 1
+
+        return added, updated
+
+    def _project_key(self, project: Project) -> Tuple[str, str]:
+        """Identity of a project across scrapes"""
+        return (project.project_name, project.address)
+
+    def _search_keys(self, project: Project) -> Tuple[str, str]:
+        """Lowercased city and developer keys used by the filter indexes"""
+        return (project.city or "").lower(), (project.developer_name or "").lower()
+
+    def _rebuild_indexes(self):
+        """Rebuild the key, city, developer and confidence indexes"""
+        self._by_key: Dict[Tuple[str, str], int] = {}
+        self.by_city: Dict[str, List[int]] = {}
+        self.by_dev: Dict[str, List[int]] = {}
+
+        for i, project in enumerate(self.projects):
+            city_l, dev_l = self._search_keys(project)
+            self._by_key[self._project_key(project)] = i
+            self.by_city.setdefault(city_l, []).append(i)
+            self.by_dev.setdefault(dev_l, []).append(i)
+
+        self.by_conf_sorted: List[Tuple[float, int]] = sorted(
+            (project.data_confidence_score, i) for i, project in enumerate(self.projects)
+        )
+
+    def _index_project(self, i: int):
+        """Add a single project to the lookup indexes"""
+        project = self.projects[i]
+        city_l, dev_l = self._search_keys(project)
+
+        bisect.insort(self.by_city.setdefault(city_l, []), i)
+        bisect.insort(self.by_dev.setdefault(dev_l, []), i)
+        bisect.insort(self.by_conf_sorted, (project.data_confidence_score, i))
+
+    def _unindex_project(self, i: int):
+        """Remove a single project from the lookup indexes, before its fields change"""
+        city_l, dev_l = self._search_keys(self.projects[i])
+        for index, key in ((self.by_city, city_l), (self.by_dev, dev_l)):
+            ids = index[key]
+            ids.remove(i)
+            if not ids:
+                del index[key]
+
+        entry = (self.projects[i].data_confidence_score, i)
+        del self.by_conf_sorted[bisect.bisect_left(self.by_conf_sorted, entry)]
+
+    def filter(self,
+               city: Optional[str] = None,
+               developer: Optional[str] = None,
+               min_confidence: Optional[float] = None,
+               limit: Optional[int] = None) -> List[Project]:
+        """Return projects matching all given filters, in storage order"""
+        matches: Optional[Set[int]] = None
+
+        if city:
+            matches = self._match_substring(self.by_city, city.lower())
+
+        if developer:
+            dev_matches = self._match_substring(self.by_dev, developer.lower())
+            matches = dev_matches if matches is None else matches & dev_matches
+
+        if min_confidence is not None:
+            # Index is never negative, so this lands on the first score >= min_confidence
+            start = bisect.bisect_left(self.by_conf_sorted, (min_confidence, -1))
+            conf_matches = {i for _, i in self.by_conf_sorted[start:]}
+            matches = conf_matches if matches is None else matches & conf_matches
+
+        if matches is None:
+            return self.projects[:limit]
+
+        return [self.projects[i] for i in sorted(matches)[:limit]]
+
+    def _match_substring(self, index: Dict[str, List[int]], needle: str) -> Set[int]:
+        """Collect indexes for every distinct key containing the needle"""
+        return {i for key, ids in index.items() if needle in key for i in ids}
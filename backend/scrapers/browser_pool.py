@@ -0,0 +1,68 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from playwright.async_api import async_playwright, Browser, BrowserContext, Playwright
+import logging
+
+logger = logging.getLogger(__name__)
+
+class BrowserPool:
+    """Single Chromium instance shared by the scrapers, launched on first use"""
+
+    def __init__(self):
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self) -> "BrowserPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self) -> Browser:
+        """Launch the shared browser if it isn't running yet"""
+        async with self._lock:
+            if self._browser is None or not self._browser.is_connected():
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=True)
+                logger.info("Launched shared browser")
+            return self._browser
+
+    async def new_context(self, **options) -> BrowserContext:
+        """Open a fresh context on the shared browser"""
+        browser = await self.start()
+        return await browser.new_context(**options)
+
+    async def close(self):
+        """Close the shared browser and stop Playwright"""
+        async with self._lock:
+            if self._browser is not None:
+                try:
+                    await self._browser.close()
+                except Exception as e:
+                    logger.warning(f"Error closing shared browser: {str(e)}")
+                self._browser = None
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+
+@asynccontextmanager
+async def browser_context(pool: Optional[BrowserPool], **options) -> AsyncIterator[BrowserContext]:
+    """Browser context from the shared pool, or from a browser launched just for this call"""
+    if pool is not None:
+        context = await pool.new_context(**options)
+        try:
+            yield context
+        finally:
+            await context.close()
+        return
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        try:
+            yield await browser.new_context(**options)
+        finally:
+            await browser.close()
@@ -3,54 +3,85 @@ import json
 import re
 from datetime import datetime
 from typing import List, Dict, Any, Optional
-from playwright.async_api import async_playwright, Page
+from playwright.async_api import Page
 from bs4 import BeautifulSoup
 import logging
 
 from models.project import Project, Transaction, DataSource
 from config import Config
+from scrapers.browser_pool import BrowserPool, browser_context
 
 logger = logging.getLogger(__name__)
 
+# Precompiled extraction patterns
+_RE_DEVELOPER_LABEL = re.compile(r'קבלן|מפתח', re.IGNORECASE)
+_RE_ADDRESS_LABEL = re.compile(r'כתובת|כתובת הפרויקט', re.IGNORECASE)
+_RE_STATUS_LABEL = re.compile(r'סטטוס|מצב הפרויקט', re.IGNORECASE)
+_RE_PRICE_TEXT = re.compile(r'₪[\d,]+', re.IGNORECASE)
+_RE_PRICE = re.compile(r'₪([\d,]+)')
+_RE_YEAR = re.compile(r'(\d{4})')
+_RE_TRANSACTIONS_LABEL = re.compile(r'עסקאות|מכירות', re.IGNORECASE)
+_RE_TRANSACTION_CLASS = re.compile('transaction')
+# DD/MM/YYYY, split into groups so rows skip strptime
+_RE_DATE = re.compile(r'(\d{2})/(\d{2})/(\d{4})')
+
+# Serializes the page body with scripts, styles and inline graphics removed,
+# which make up most of a rendered page but hold none of the project data
+_CONTENT_JS = """() => {
+    const body = document.body.cloneNode(true);
+    body.querySelectorAll('script, style, noscript, template, svg, iframe').forEach(el => el.remove());
+    return body.outerHTML;
+}"""
+
 class MadlanScraper:
-    def __init__(self):
+    def __init__(self, pool: Optional[BrowserPool] = None):
         self.config = Config()
         self.base_url = self.config.MADLAN_BASE_URL
+        self.pool = pool
         
     async def scrape_projects(self, city: str = "tel-aviv") -> List[Project]:
         """Scrape real estate projects from Madlan for a specific city"""
         projects = []
         
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context(
-                user_agent=self.config.USER_AGENT,
-                viewport={'width': 1920, 'height': 1080}
-            )
+        async with browser_context(
+            self.pool,
+            user_agent=self.config.USER_AGENT,
+            viewport={'width': 1920, 'height': 1080}
+        ) as context:
+            page = await context.new_page()
+            await self._handle_consent(page)
             
-            try:
-                page = await context.new_page()
-                await self._handle_consent(page)
-                
-                # Navigate to city projects page
-                city_url = f"{self.base_url}/projects/{city}"
-                await page.goto(city_url, wait_until='networkidle')
-                
-                # Get all project links
-                project_links = await self._get_project_links(page)
-                
-                for link in project_links[:10]:  # Limit for testing
+            # Navigate to city projects page
+            city_url = f"{self.base_url}/projects/{city}"
+            await page.goto(city_url, wait_until='networkidle')
+            
+            # Get all project links
+            project_links = await self._get_project_links(page)
+            await page.close()
+            
+            # Scrape project pages concurrently, each on its own page
+            semaphore = asyncio.Semaphore(self.config.SCRAPE_CONCURRENCY)
+            
+            async def scrape_one(link: str) -> Optional[Project]:
+                async with semaphore:
+                    detail_page = await context.new_page()
                     try:
-                        project = await self._scrape_project_details(page, link)
-                        if project:
-                            projects.append(project)
-                    except Exception as e:
-                        logger.error(f"Error scraping project {link}: {str(e)}")
-                        continue
-                        
-            finally:
-                await browser.close()
-                
+                        return await self._scrape_project_details(detail_page, link)
+                    finally:
+                        await detail_page.close()
+            
+            links = project_links[:10]  # Limit for testing
+            results = await asyncio.gather(
+                *(scrape_one(link) for link in links),
+                return_exceptions=True
+            )
+            
+            for link, result in zip(links, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Error scraping project {link}: {str(result)}")
+                elif result:
+                    projects.append(result)
+                    
         return projects
     
     async def _handle_consent(self, page: Page):
@@ -82,9 +113,12 @@ class MadlanScraper:
         await page.goto(project_url, wait_until='networkidle')
         await page.wait_for_timeout(2000)
         
-        # Get page content
-        content = await page.content()
-        soup = BeautifulSoup(content, 'html.parser')
+        # Get page content without the markup the extractors never read
+        try:
+            content = await page.evaluate(_CONTENT_JS)
+        except Exception:
+            content = await page.content()
+        soup = BeautifulSoup(content, 'lxml')
         
         # Extract project information
         project_data = self._extract_project_info(soup, project_url)
@@ -126,12 +160,12 @@ class MadlanScraper:
         data['name'] = name_elem.text.strip() if name_elem else ''
         
         # Developer
-        dev_elem = soup.find(text=re.compile(r'קבלן|מפתח', re.IGNORECASE))
+        dev_elem = soup.find(text=_RE_DEVELOPER_LABEL)
         if dev_elem:
             data['developer'] = dev_elem.find_next().text.strip() if dev_elem.find_next() else None
         
         # Address
-        addr_elem = soup.find(text=re.compile(r'כתובת|כתובת הפרויקט', re.IGNORECASE))
+        addr_elem = soup.find(text=_RE_ADDRESS_LABEL)
         if addr_elem:
             data['address'] = addr_elem.find_next().text.strip() if addr_elem.find_next() else ''
         
@@ -143,9 +177,9 @@ class MadlanScraper:
                 data['city'] = url_parts[city_index].replace('-', ' ').title()
         
         # Price range
-        price_text = soup.find(text=re.compile(r'₪[\d,]+', re.IGNORECASE))
+        price_text = soup.find(text=_RE_PRICE_TEXT)
         if price_text:
-            prices = re.findall(r'₪([\d,]+)', price_text)
+            prices = _RE_PRICE.findall(price_text)
             if prices:
                 prices = [int(p.replace(',', '')) for p in prices]
                 data['unit_prices'] = {
@@ -155,12 +189,12 @@ class MadlanScraper:
                 }
         
         # Project status
-        status_elem = soup.find(text=re.compile(r'סטטוס|מצב הפרויקט', re.IGNORECASE))
+        status_elem = soup.find(text=_RE_STATUS_LABEL)
         if status_elem:
             data['status'] = status_elem.find_next().text.strip() if status_elem.find_next() else ''
         
         # Completion year
-        year_match = re.search(r'(\d{4})', soup.text)
+        year_match = _RE_YEAR.search(soup.text)
         if year_match:
             year = int(year_match.group(1))
             if 2020 <= year <= 2030:  # Reasonable range
@@ -173,21 +207,23 @@ class MadlanScraper:
         transactions = []
         
         # Look for transaction tables or lists
-        trans_sections = soup.find_all(['table', 'div'], text=re.compile(r'עסקאות|מכירות', re.IGNORECASE))
+        trans_sections = soup.find_all(['table', 'div'], text=_RE_TRANSACTIONS_LABEL)
         
         for section in trans_sections:
-            rows = section.find_all('tr') or section.find_all('div', class_=re.compile('transaction'))
+            rows = section.find_all('tr') or section.find_all('div', class_=_RE_TRANSACTION_CLASS)
             for row in rows:
                 text = row.text
-                price_match = re.search(r'₪([\d,]+)', text)
-                date_match = re.search(r'(\d{2}/\d{2}/\d{4})', text)
+                price_match = _RE_PRICE.search(text)
+                date_match = _RE_DATE.search(text)
                 
                 if price_match and date_match:
                     try:
                         price = int(price_match.group(1).replace(',', ''))
-                        date = datetime.strptime(date_match.group(1), '%d/%m/%Y')
+                        day, month, year = date_match.groups()
+                        date = datetime(int(year), int(month), int(day))
                         
-                        transaction = Transaction(
+                        # Both fields are parsed above, so skip pydantic validation
+                        transaction = Transaction.model_construct(
                             price=price,
                             sale_date=date
                         )
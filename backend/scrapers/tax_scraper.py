@@ -2,20 +2,53 @@ import asyncio
 import json
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
-from playwright.async_api import async_playwright, Page
-from bs4 import BeautifulSoup
+from playwright.async_api import Page
 import logging
 import re
 
 from models.project import Transaction, DataSource
 from config import Config
+from scrapers.browser_pool import BrowserPool, browser_context
 
 logger = logging.getLogger(__name__)
 
+# Precompiled row parsing patterns
+_RE_ADDRESS = re.compile(r'(.+?)\s*,\s*([^,]+)$')
+_RE_WS = re.compile(r'\s+')
+
+# Price, DD/MM/YYYY date, size and floor in one alternation, so a single
+# scan over the row finds the first occurrence of each
+_RE_ROW_FIELDS = re.compile(
+    r'₪(?P<price>[\d,]+)'
+    r'|(?P<date>(?P<day>\d{2})/(?P<month>\d{2})/(?P<year>\d{4}))'
+    r'|(?P<size>\d+)\s*מ"ר'
+    r'|קומה\s+(?P<floor>\d+)(?![\d/])'
+)
+_ROW_FIELD_COUNT = 4
+
+# Common street type abbreviations, applied in one pass with longest keys first
+_STREET_MAP = {
+    'רחוב': 'רח',
+    'שדרות': 'שד',
+    'הרב': 'הרב',
+    'הרבנית': 'הרבנית'
+}
+_STREET_RE = re.compile('|'.join(re.escape(k) for k in sorted(_STREET_MAP, key=len, reverse=True)))
+
+# Common Israeli cities, in lookup priority order
+_CITIES = (
+    'תל אביב', 'ירושלים', 'חיפה', 'באר שבע', 'אשדוד', 'אשקלון',
+    'פתח תקווה', 'נתניה', 'חולון', 'רמת גן', 'גבעתיים', 'ראשון לציון',
+    'הרצליה', 'רעננה', 'כפר סבא', 'הוד השרון', 'רמת השרון'
+)
+_CITY_PRIORITY = {city: i for i, city in enumerate(_CITIES)}
+_CITY_RE = re.compile('|'.join(re.escape(c) for c in sorted(_CITIES, key=len, reverse=True)))
+
 class TaxAuthorityScraper:
-    def __init__(self):
+    def __init__(self, pool: Optional[BrowserPool] = None):
         self.config = Config()
         self.base_url = self.config.TAX_AUTHORITY_BASE_URL
+        self.pool = pool
         
     async def scrape_transactions(self, city: str = "תל אביב", 
                                 start_date: Optional[datetime] = None,
@@ -28,36 +61,30 @@ class TaxAuthorityScraper:
             
         transactions = []
         
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context(
-                user_agent=self.config.USER_AGENT,
-                viewport={'width': 1920, 'height': 1080}
+        async with browser_context(
+            self.pool,
+            user_agent=self.config.USER_AGENT,
+            viewport={'width': 1920, 'height': 1080}
+        ) as context:
+            page = await context.new_page()
+            
+            # Navigate to tax authority real estate transactions
+            await self._navigate_to_transactions(page)
+            
+            # Search for transactions in the specified city and date range
+            search_results = await self._search_transactions(
+                page, city, start_date, end_date
             )
             
-            try:
-                page = await context.new_page()
-                
-                # Navigate to tax authority real estate transactions
-                await self._navigate_to_transactions(page)
-                
-                # Search for transactions in the specified city and date range
-                search_results = await self._search_transactions(
-                    page, city, start_date, end_date
-                )
-                
-                for result in search_results:
-                    try:
-                        transaction = await self._extract_transaction_details(page, result)
-                        if transaction:
-                            transactions.append(transaction)
-                    except Exception as e:
-                        logger.error(f"Error extracting transaction: {str(e)}")
-                        continue
-                        
-            finally:
-                await browser.close()
-                
+            for result in search_results:
+                try:
+                    transaction = await self._extract_transaction_details(page, result)
+                    if transaction:
+                        transactions.append(transaction)
+                except Exception as e:
+                    logger.error(f"Error extracting transaction: {str(e)}")
+                    continue
+                    
         return transactions
     
     async def _navigate_to_transactions(self, page: Page):
@@ -122,32 +149,41 @@ class TaxAuthorityScraper:
             text = await row_element.text_content()
             
             # Extract address
-            address_match = re.search(r'(.+?)\s*,\s*([^,]+)$', text)
+            address_match = _RE_ADDRESS.search(text)
             if not address_match:
                 return None
                 
             full_address = address_match.group(0).strip()
             
-            # Extract price
-            price_match = re.search(r'₪([\d,]+)', text)
+            # Extract price, date, size and floor in one pass
+            fields = {}
+            for match in _RE_ROW_FIELDS.finditer(text):
+                fields.setdefault(match.lastgroup, match)
+                if len(fields) == _ROW_FIELD_COUNT:
+                    break
+            
+            price_match = fields.get('price')
             if not price_match:
                 return None
                 
-            price = int(price_match.group(1).replace(',', ''))
+            price = int(price_match.group('price').replace(',', ''))
             
-            # Extract date
-            date_match = re.search(r'(\d{2}/\d{2}/\d{4})', text)
+            date_match = fields.get('date')
             if not date_match:
                 return None
                 
-            sale_date = datetime.strptime(date_match.group(1), '%d/%m/%Y')
+            sale_date = datetime(
+                int(date_match.group('year')),
+                int(date_match.group('month')),
+                int(date_match.group('day'))
+            )
             
-            # Extract additional details
-            size_match = re.search(r'(\d+)\s*מ"ר', text)
-            size = float(size_match.group(1)) if size_match else None
+            # Additional details
+            size_match = fields.get('size')
+            size = float(size_match.group('size')) if size_match else None
             
-            floor_match = re.search(r'קומה\s+(\d+)', text)
-            floor = int(floor_match.group(1)) if floor_match else None
+            floor_match = fields.get('floor')
+            floor = int(floor_match.group('floor')) if floor_match else None
             
             return {
                 'address': full_address,
@@ -183,34 +219,20 @@ class TaxAuthorityScraper:
     def _normalize_address(self, address: str) -> str:
         """Normalize Hebrew address for better matching"""
         # Remove extra spaces and normalize
-        address = re.sub(r'\s+', ' ', address.strip())
+        address = _RE_WS.sub(' ', address.strip())
         
         # Common abbreviations
-        replacements = {
-            'רחוב': 'רח',
-            'שדרות': 'שד',
-            'הרב': 'הרב',
-            'הרבנית': 'הרבנית'
-        }
-        
-        for full, abbr in replacements.items():
-            address = address.replace(full, abbr)
+        address = _STREET_RE.sub(lambda m: _STREET_MAP[m.group(0)], address)
             
         return address
     
     def _extract_city_from_address(self, address: str) -> str:
         """Extract city name from full address"""
-        # Common Israeli cities
-        cities = [
-            'תל אביב', 'ירושלים', 'חיפה', 'באר שבע', 'אשדוד', 'אשקלון',
-            'פתח תקווה', 'נתניה', 'חולון', 'רמת גן', 'גבעתיים', 'ראשון לציון',
-            'הרצליה', 'רעננה', 'כפר סבא', 'הוד השרון', 'רמת השרון'
-        ]
-        
-        address_lower = address.lower()
-        for city in cities:
-            if city.lower() in address_lower:
-                return city
+        # One scan for every known city; when several appear (e.g. a street
+        # named after another city), the earliest in _CITIES wins
+        found = _CITY_RE.findall(address)
+        if found:
+            return min(found, key=_CITY_PRIORITY.__getitem__)
                 
         # Fallback - take last part after comma
         parts = address.split(',')
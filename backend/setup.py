@@ -4,32 +4,88 @@ Setup script for Market Survey System backend
 """
 
 import os
+import shlex
 import subprocess
 import sys
-from pathlib import Path
+from importlib import metadata
+
+def split_command(cmd):
+    """Argument list for a command given as a string or a list"""
+    return shlex.split(cmd) if isinstance(cmd, str) else cmd
+
+def format_command(cmd):
+    """Printable form of a command given as a string or a list"""
+    return cmd if isinstance(cmd, str) else shlex.join(cmd)
 
 def run_command(cmd, check=True):
-    """Run shell command"""
-    print(f"Running: {cmd}")
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+    """Run command, streaming its output to the terminal"""
+    print(f"Running: {format_command(cmd)}")
+    try:
+        result = subprocess.run(split_command(cmd), check=False)
+    except FileNotFoundError:
+        print(f"Error: command {format_command(cmd)} not found")
+        sys.exit(1)
     if check and result.returncode != 0:
-        print(f"Error: {result.stderr}")
+        print(f"Error: command {format_command(cmd)} exited {result.returncode}")
         sys.exit(1)
     return result
 
+def start_command(cmd):
+    """Start command without waiting for it"""
+    print(f"Running: {format_command(cmd)}")
+    try:
+        return subprocess.Popen(split_command(cmd))
+    except FileNotFoundError:
+        print(f"Error: command {format_command(cmd)} not found")
+        sys.exit(1)
+
+def wait_commands(procs):
+    """Wait for started commands, exiting if any failed"""
+    results = [(cmd, proc.wait()) for cmd, proc in procs]
+    for cmd, returncode in results:
+        if returncode != 0:
+            print(f"Error: command {format_command(cmd)} exited {returncode}")
+            sys.exit(1)
+
+def pinned_version(package, requirements="requirements.txt"):
+    """Version pinned with == for a package in the requirements file"""
+    with open(requirements) as f:
+        for line in f:
+            name, sep, version = line.split("#")[0].strip().partition("==")
+            if sep and name.strip().lower() == package:
+                return version.strip()
+    return None
+
+def installed_version(package):
+    """Version of a package installed for this interpreter"""
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return None
+
 def install_dependencies():
     """Install Python dependencies"""
-    print("Installing Python dependencies...")
-    run_command("pip install -r requirements.txt")
+    print("Installing Python dependencies and Playwright browsers...")
+    pip_cmd = [sys.executable, "-m", "pip", "install", "-r", "requirements.txt"]
+    browsers_cmd = [sys.executable, "-m", "playwright", "install", "chromium"]
+    
+    # The browser download runs from the installed playwright package, so it
+    # can only overlap with pip when that package is already the pinned
+    # version and pip has nothing to replace underneath it
+    playwright_version = installed_version("playwright")
+    if playwright_version is None or playwright_version != pinned_version("playwright"):
+        run_command(pip_cmd)
+        run_command(browsers_cmd)
+        return
     
-    # Install Playwright browsers
-    print("Installing Playwright browsers...")
-    run_command("playwright install chromium")
+    wait_commands([
+        (pip_cmd, start_command(pip_cmd)),
+        (browsers_cmd, start_command(browsers_cmd))
+    ])
 
 def create_directories():
     """Create necessary directories"""
     directories = [
-        "data",
         "data/json",
         "logs",
         "scrapers",
@@ -37,9 +93,10 @@ def create_directories():
         "matchers"
     ]
     
+    # makedirs creates parents too, so "data" comes with "data/json"
     for directory in directories:
-        Path(directory).mkdir(parents=True, exist_ok=True)
-        print(f"Created directory: {directory}")
+        os.makedirs(directory, exist_ok=True)
+    print(f"Created directories: data, {', '.join(directories)}")
 
 def create_env_file():
     """Create .env file with default configuration"""
@@ -0,0 +1,62 @@
+import asyncio
+import time
+
+import orjson
+
+from ai.insights import AIInsightsGenerator
+from models.project import Project
+
+
+def _projects():
+    return [Project(project_name="Park Tower", developer_name="Azorim",
+                    address="Herzl 10", city="Tel Aviv")]
+
+
+def _generator(cache_file):
+    generator = AIInsightsGenerator(cache_file=str(cache_file))
+    generator.api_key = "test-key"
+    return generator
+
+
+def test_persisted_insights_survive_restart(tmp_path):
+    cache_file = tmp_path / "insights_cache.json"
+    calls = []
+
+    async def call_llm(system_prompt, data_summary):
+        calls.append(system_prompt)
+        return "Prices are rising."
+
+    async def first_run():
+        generator = _generator(cache_file)
+        generator._call_llm = call_llm
+        return await generator.generate_insights(_projects())
+
+    first = asyncio.run(first_run())
+    assert first["success"] and len(calls) == 1
+
+    # Restart well past the in-memory TTL, then re-scrape the same data
+    data = orjson.loads(cache_file.read_bytes())
+    data["generated_at"] = time.time() - 3600
+    cache_file.write_bytes(orjson.dumps(data))
+
+    async def after_restart():
+        generator = _generator(cache_file)
+        generator._call_llm = call_llm
+        generator.load_cache()
+        return await generator.generate_insights(_projects())
+
+    assert asyncio.run(after_restart()) == first
+    assert len(calls) == 1
+
+
+def test_expired_persisted_insights_are_ignored(tmp_path):
+    cache_file = tmp_path / "insights_cache.json"
+    cache_file.write_bytes(orjson.dumps({
+        "fingerprint": "00" * 16,
+        "generated_at": time.time() - 2 * 86400,
+        "result": {"success": True, "insights": "stale"}
+    }))
+
+    generator = _generator(cache_file)
+    generator.load_cache()
+    assert generator._cache == {}
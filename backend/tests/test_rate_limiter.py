@@ -0,0 +1,33 @@
+import asyncio
+import time
+
+import pytest
+
+from utils.rate_limiter import HostRateLimiter
+
+
+def _acquire_all(limiter, hosts):
+    async def run():
+        start = time.monotonic()
+        await asyncio.gather(*(limiter.acquire(host) for host in hosts))
+        return time.monotonic() - start
+    return asyncio.run(run())
+
+
+def test_zero_rate_disables_throttling():
+    limiter = HostRateLimiter(0)
+    assert _acquire_all(limiter, ["example.com"] * 100) < 0.1
+
+
+def test_negative_rate_is_rejected():
+    with pytest.raises(ValueError):
+        HostRateLimiter(-1)
+
+
+def test_requests_beyond_the_burst_wait_per_host():
+    limiter = HostRateLimiter(20)
+    # 20 requests go out at once, the next 5 are spaced 50ms apart
+    elapsed = _acquire_all(limiter, ["example.com"] * 25)
+    assert 0.2 <= elapsed < 0.5
+    # Another host has its own bucket
+    assert _acquire_all(limiter, ["other.com"] * 20) < 0.1
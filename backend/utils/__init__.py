@@ -3,5 +3,6 @@ Utility modules for Market Survey System
 """
 
 from .city_discovery import CityDiscovery
+from .rate_limiter import HostRateLimiter
 
-__all__ = ['CityDiscovery']
+__all__ = ['CityDiscovery', 'HostRateLimiter']
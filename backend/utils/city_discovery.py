@@ -1,36 +1,156 @@
 import asyncio
+import html
 import logging
-from typing import List, Dict, Any
-from playwright.async_api import async_playwright
+from typing import List, Dict, Any, Optional, Tuple
+import httpx
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 from bs4 import BeautifulSoup
 import re
+import time
+from operator import itemgetter
+from urllib.parse import urlparse
 
 from config import Config
+from scrapers.browser_pool import BrowserPool, browser_context
+from utils.rate_limiter import HostRateLimiter
 
 logger = logging.getLogger(__name__)
 
+# Seconds a city availability result is reused before checking again
+VERIFY_CACHE_TTL = 3600
+
+# Responses worth retrying, and the first backoff delay in seconds
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+_RETRY_BASE_DELAY = 0.5
+
+# HTTP statuses that block plain clients but may still let a browser through
+_BOT_BLOCK_STATUSES = frozenset({403, 429})
+
+# Selectors for city navigation, tried in order until one matches
+_CITY_SELECTORS = (
+    'select[name*="city"] option',
+    'select[name*="location"] option',
+    '.city-selector option',
+    '.location-dropdown option',
+    'a[href*="/projects/"]'
+)
+
+# Any of these on a city page means it lists projects
+_PROJECT_INDICATOR = '[data-testid="project-card"], .project-card, .project-item, a[href*="/project/"]'
+
+# Page text meaning a city has no projects
+_NO_PROJECTS_INDICATORS = ('no projects', 'אין פרויקטים', 'לא נמצאו פרויקטים')
+
+# Major Israeli cities, used when discovery finds nothing
+_FALLBACK_CITIES = (
+    {'name': 'Tel Aviv', 'slug': 'tel-aviv', 'hebrew_name': 'תל אביב'},
+    {'name': 'Jerusalem', 'slug': 'jerusalem', 'hebrew_name': 'ירושלים'},
+    {'name': 'Haifa', 'slug': 'haifa', 'hebrew_name': 'חיפה'},
+    {'name': 'Beer Sheva', 'slug': 'beer-sheva', 'hebrew_name': 'באר שבע'},
+    {'name': 'Ashdod', 'slug': 'ashdod', 'hebrew_name': 'אשדוד'},
+    {'name': 'Ashkelon', 'slug': 'ashkelon', 'hebrew_name': 'אשקלון'},
+    {'name': 'Petah Tikva', 'slug': 'petah-tikva', 'hebrew_name': 'פתח תקווה'},
+    {'name': 'Netanya', 'slug': 'netanya', 'hebrew_name': 'נתניה'},
+    {'name': 'Holon', 'slug': 'holon', 'hebrew_name': 'חולון'},
+    {'name': 'Ramat Gan', 'slug': 'ramat-gan', 'hebrew_name': 'רמת גן'},
+    {'name': 'Givatayim', 'slug': 'givatayim', 'hebrew_name': 'גבעתיים'},
+    {'name': 'Rishon LeZion', 'slug': 'rishon-lezion', 'hebrew_name': 'ראשון לציון'},
+    {'name': 'Herzliya', 'slug': 'herzliya', 'hebrew_name': 'הרצליה'},
+    {'name': 'Raanana', 'slug': 'raanana', 'hebrew_name': 'רעננה'},
+    {'name': 'Kfar Saba', 'slug': 'kfar-saba', 'hebrew_name': 'כפר סבא'},
+    {'name': 'Hod Hasharon', 'slug': 'hod-hasharon', 'hebrew_name': 'הוד השרון'},
+    {'name': 'Ramat Hasharon', 'slug': 'ramat-hasharon', 'hebrew_name': 'רמת השרון'},
+    {'name': 'Bat Yam', 'slug': 'bat-yam', 'hebrew_name': 'בת ים'},
+    {'name': 'Rehovot', 'slug': 'rehovot', 'hebrew_name': 'רחובות'},
+    {'name': 'Modiin', 'slug': 'modiin', 'hebrew_name': 'מודיעין'},
+    {'name': 'Eilat', 'slug': 'eilat', 'hebrew_name': 'אילת'},
+    {'name': 'Nazareth', 'slug': 'nazareth', 'hebrew_name': 'נצרת'},
+    {'name': 'Acre', 'slug': 'acre', 'hebrew_name': 'עכו'},
+    {'name': 'Tiberias', 'slug': 'tiberias', 'hebrew_name': 'טבריה'},
+    {'name': 'Safed', 'slug': 'safed', 'hebrew_name': 'צפת'},
+    {'name': 'Kiryat Shmona', 'slug': 'kiryat-shmona', 'hebrew_name': 'קריית שמונה'},
+    {'name': 'Dimona', 'slug': 'dimona', 'hebrew_name': 'דימונה'},
+    {'name': 'Arad', 'slug': 'arad', 'hebrew_name': 'ערד'},
+    {'name': 'Kiryat Gat', 'slug': 'kiryat-gat', 'hebrew_name': 'קריית גת'},
+    {'name': 'Lod', 'slug': 'lod', 'hebrew_name': 'לוד'},
+    {'name': 'Ramla', 'slug': 'ramla', 'hebrew_name': 'רמלה'}
+)
+
+# Hebrew city names with their English equivalents
+_HE2EN = {
+    'תל אביב': 'Tel Aviv',
+    'ירושלים': 'Jerusalem',
+    'חיפה': 'Haifa',
+    'באר שבע': 'Beer Sheva',
+    'אשדוד': 'Ashdod',
+    'אשקלון': 'Ashkelon',
+    'פתח תקווה': 'Petah Tikva',
+    'נתניה': 'Netanya',
+    'חולון': 'Holon',
+    'רמת גן': 'Ramat Gan'
+}
+_EN2HE = {english: hebrew for hebrew, english in _HE2EN.items()}
+
+_RE_PROJECT_HREF = re.compile(r'/projects/[^/]+$')
+_RE_PROJECT_LINK = re.compile(r'<a\s[^>]*?href=["\']([^"\']*/projects/[^/"\']+)["\']', re.IGNORECASE)
+# Hebrew Unicode block
+_RE_HEBREW = re.compile(r'[\u0590-\u05FF]')
+
 class CityDiscovery:
-    def __init__(self):
+    def __init__(self, pool: Optional[BrowserPool] = None):
         self.config = Config()
         self.base_url = self.config.MADLAN_BASE_URL
         
+        # One browser for discovery and every verification, launched on first
+        # use; a pool created here is closed by aclose()
+        self._owns_pool = pool is None
+        self.pool = pool or BrowserPool()
+        
+        # Plain HTTP client for pages that don't need a browser
+        self._http = httpx.AsyncClient(
+            http2=True,
+            timeout=10,
+            headers={'User-Agent': self.config.USER_AGENT},
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=30),
+            follow_redirects=True
+        )
+        
+        # Shared by browser navigations and HTTP checks so parallel
+        # verification stays within the per-host request rate
+        self._rate_limiter = HostRateLimiter(self.config.SCRAPE_RATE_LIMIT)
+        
+        # Availability results by slug as (checked_at, available), with one
+        # lock per slug so concurrent checks of a city share a single request
+        self._verify_cache: Dict[str, Tuple[float, bool]] = {}
+        self._verify_locks: Dict[str, asyncio.Lock] = {}
+        
+    async def __aenter__(self) -> "CityDiscovery":
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+    
+    async def aclose(self):
+        """Close the HTTP client, and the browser if this instance owns it"""
+        await self._http.aclose()
+        if self._owns_pool:
+            await self.pool.close()
+        
     async def discover_available_cities(self) -> List[Dict[str, str]]:
         """Discover all available cities from Madlan website"""
         cities = []
         
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context(
-                user_agent=self.config.USER_AGENT,
-                viewport={'width': 1920, 'height': 1080}
-            )
-            
+        async with browser_context(
+            self.pool,
+            user_agent=self.config.USER_AGENT,
+            viewport={'width': 1920, 'height': 1080}
+        ) as context:
             try:
                 page = await context.new_page()
                 
                 # Navigate to main page to find city links
-                await page.goto(self.base_url, wait_until='networkidle')
-                await page.wait_for_timeout(3000)
+                await self._goto(page, self.base_url, wait_until='networkidle')
+                await self._wait_for_selector(page, ', '.join(_CITY_SELECTORS))
                 
                 # Look for city navigation or search functionality
                 cities_found = await self._extract_cities_from_navigation(page)
@@ -49,8 +169,6 @@ class CityDiscovery:
             except Exception as e:
                 logger.error(f"Error discovering cities: {str(e)}")
                 return self._get_fallback_cities()
-            finally:
-                await browser.close()
     
     async def _extract_cities_from_navigation(self, page) -> List[Dict[str, str]]:
         """Extract cities from main navigation or dropdown"""
@@ -59,18 +177,10 @@ class CityDiscovery:
         try:
             # Look for city selector dropdown or navigation
             content = await page.content()
-            soup = BeautifulSoup(content, 'html.parser')
+            soup = BeautifulSoup(content, 'lxml')
             
             # Common selectors for city navigation
-            city_selectors = [
-                'select[name*="city"] option',
-                'select[name*="location"] option',
-                '.city-selector option',
-                '.location-dropdown option',
-                'a[href*="/projects/"]'
-            ]
-            
-            for selector in city_selectors:
+            for selector in _CITY_SELECTORS:
                 elements = soup.select(selector)
                 if elements:
                     for element in elements:
@@ -92,17 +202,19 @@ class CityDiscovery:
         try:
             # Navigate to projects page
             projects_url = f"{self.base_url}/projects"
-            await page.goto(projects_url, wait_until='networkidle')
-            await page.wait_for_timeout(2000)
+            await self._goto(page, projects_url, wait_until='networkidle')
+            await self._wait_for_selector(page, 'a[href*="/projects/"]')
             
             content = await page.content()
-            soup = BeautifulSoup(content, 'html.parser')
             
-            # Look for city-specific project links
-            project_links = soup.find_all('a', href=re.compile(r'/projects/[^/]+$'))
+            # Look for city-specific project links straight in the markup,
+            # parsing the page only if the pattern finds none
+            hrefs = [html.unescape(href) for href in _RE_PROJECT_LINK.findall(content)]
+            if not hrefs:
+                soup = BeautifulSoup(content, 'lxml')
+                hrefs = [link.get('href', '') for link in soup.find_all('a', href=_RE_PROJECT_HREF)]
             
-            for link in project_links:
-                href = link.get('href', '')
+            for href in hrefs:
                 city_slug = href.split('/')[-1] if href else ''
                 
                 if city_slug and len(city_slug) > 2:
@@ -119,6 +231,14 @@ class CityDiscovery:
             logger.error(f"Error extracting cities from projects page: {str(e)}")
             return []
     
+    async def _wait_for_selector(self, page, selector: str, timeout: int = 5000) -> bool:
+        """Wait until an element matching the selector is in the DOM"""
+        try:
+            await page.wait_for_selector(selector, state='attached', timeout=timeout)
+            return True
+        except PlaywrightTimeoutError:
+            return False
+    
     def _parse_city_element(self, element) -> Dict[str, str]:
         """Parse city information from HTML element"""
         try:
@@ -153,53 +273,22 @@ class CityDiscovery:
     
     def _get_fallback_cities(self) -> List[Dict[str, str]]:
         """Fallback list of major Israeli cities"""
-        return [
-            {'name': 'Tel Aviv', 'slug': 'tel-aviv', 'hebrew_name': 'תל אביב'},
-            {'name': 'Jerusalem', 'slug': 'jerusalem', 'hebrew_name': 'ירושלים'},
-            {'name': 'Haifa', 'slug': 'haifa', 'hebrew_name': 'חיפה'},
-            {'name': 'Beer Sheva', 'slug': 'beer-sheva', 'hebrew_name': 'באר שבע'},
-            {'name': 'Ashdod', 'slug': 'ashdod', 'hebrew_name': 'אשדוד'},
-            {'name': 'Ashkelon', 'slug': 'ashkelon', 'hebrew_name': 'אשקלון'},
-            {'name': 'Petah Tikva', 'slug': 'petah-tikva', 'hebrew_name': 'פתח תקווה'},
-            {'name': 'Netanya', 'slug': 'netanya', 'hebrew_name': 'נתניה'},
-            {'name': 'Holon', 'slug': 'holon', 'hebrew_name': 'חולון'},
-            {'name': 'Ramat Gan', 'slug': 'ramat-gan', 'hebrew_name': 'רמת גן'},
-            {'name': 'Givatayim', 'slug': 'givatayim', 'hebrew_name': 'גבעתיים'},
-            {'name': 'Rishon LeZion', 'slug': 'rishon-lezion', 'hebrew_name': 'ראשון לציון'},
-            {'name': 'Herzliya', 'slug': 'herzliya', 'hebrew_name': 'הרצליה'},
-            {'name': 'Raanana', 'slug': 'raanana', 'hebrew_name': 'רעננה'},
-            {'name': 'Kfar Saba', 'slug': 'kfar-saba', 'hebrew_name': 'כפר סבא'},
-            {'name': 'Hod Hasharon', 'slug': 'hod-hasharon', 'hebrew_name': 'הוד השרון'},
-            {'name': 'Ramat Hasharon', 'slug': 'ramat-hasharon', 'hebrew_name': 'רמת השרון'},
-            {'name': 'Bat Yam', 'slug': 'bat-yam', 'hebrew_name': 'בת ים'},
-            {'name': 'Rehovot', 'slug': 'rehovot', 'hebrew_name': 'רחובות'},
-            {'name': 'Modiin', 'slug': 'modiin', 'hebrew_name': 'מודיעין'},
-            {'name': 'Eilat', 'slug': 'eilat', 'hebrew_name': 'אילת'},
-            {'name': 'Nazareth', 'slug': 'nazareth', 'hebrew_name': 'נצרת'},
-            {'name': 'Acre', 'slug': 'acre', 'hebrew_name': 'עכו'},
-            {'name': 'Tiberias', 'slug': 'tiberias', 'hebrew_name': 'טבריה'},
-            {'name': 'Safed', 'slug': 'safed', 'hebrew_name': 'צפת'},
-            {'name': 'Kiryat Shmona', 'slug': 'kiryat-shmona', 'hebrew_name': 'קריית שמונה'},
-            {'name': 'Dimona', 'slug': 'dimona', 'hebrew_name': 'דימונה'},
-            {'name': 'Arad', 'slug': 'arad', 'hebrew_name': 'ערד'},
-            {'name': 'Kiryat Gat', 'slug': 'kiryat-gat', 'hebrew_name': 'קריית גת'},
-            {'name': 'Lod', 'slug': 'lod', 'hebrew_name': 'לוד'},
-            {'name': 'Ramla', 'slug': 'ramla', 'hebrew_name': 'רמלה'}
-        ]
+        return [dict(city) for city in _FALLBACK_CITIES]
     
     def _clean_and_validate_cities(self, cities: List[Dict[str, str]]) -> List[Dict[str, str]]:
         """Clean and validate city list"""
-        seen_slugs = set()
-        cleaned_cities = []
+        # First valid entry per slug wins
+        by_slug = {}
         
         for city in cities:
-            if city and city.get('slug') and city['slug'] not in seen_slugs:
-                # Validate city name
-                if len(city.get('name', '')) > 1 and len(city.get('slug', '')) > 1:
-                    seen_slugs.add(city['slug'])
-                    cleaned_cities.append(city)
+            if not city:
+                continue
+            slug = city.get('slug')
+            name = city.get('name')
+            if slug and name and len(slug) > 1 and len(name) > 1 and slug not in by_slug:
+                by_slug[slug] = city
         
-        return sorted(cleaned_cities, key=lambda x: x['name'])
+        return sorted(by_slug.values(), key=itemgetter('name'))
     
     def _normalize_city_name(self, name: str) -> str:
         """Normalize city name"""
@@ -210,20 +299,7 @@ class CityDiscovery:
         name = ' '.join(name.split())
         
         # Convert Hebrew to English if needed
-        hebrew_to_english = {
-            'תל אביב': 'Tel Aviv',
-            'ירושלים': 'Jerusalem',
-            'חיפה': 'Haifa',
-            'באר שבע': 'Beer Sheva',
-            'אשדוד': 'Ashdod',
-            'אשקלון': 'Ashkelon',
-            'פתח תקווה': 'Petah Tikva',
-            'נתניה': 'Netanya',
-            'חולון': 'Holon',
-            'רמת גן': 'Ramat Gan'
-        }
-        
-        return hebrew_to_english.get(name, name)
+        return _HE2EN.get(name, name)
     
     def _slug_to_city_name(self, slug: str) -> str:
         """Convert slug to readable city name"""
@@ -235,86 +311,151 @@ class CityDiscovery:
     
     def _get_hebrew_name(self, english_name: str) -> str:
         """Get Hebrew name for English city name"""
-        english_to_hebrew = {
-            'Tel Aviv': 'תל אביב',
-            'Jerusalem': 'ירושלים',
-            'Haifa': 'חיפה',
-            'Beer Sheva': 'באר שבע',
-            'Ashdod': 'אשדוד',
-            'Ashkelon': 'אשקלון',
-            'Petah Tikva': 'פתח תקווה',
-            'Netanya': 'נתניה',
-            'Holon': 'חולון',
-            'Ramat Gan': 'רמת גן'
-        }
-        
-        return english_to_hebrew.get(english_name, '')
+        return _EN2HE.get(english_name, '')
     
     def _is_hebrew(self, text: str) -> bool:
         """Check if text contains Hebrew characters"""
-        if not text:
-            return False
-        
-        hebrew_chars = 0
-        for char in text:
-            if '\u0590' <= char <= '\u05FF':  # Hebrew Unicode range
-                hebrew_chars += 1
-        
-        return hebrew_chars > 0
+        return bool(text) and _RE_HEBREW.search(text) is not None
 
     async def verify_city_availability(self, city_slug: str) -> bool:
         """Verify if a city has available projects on Madlan"""
-        try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                context = await browser.new_context(
-                    user_agent=self.config.USER_AGENT,
-                    viewport={'width': 1920, 'height': 1080}
-                )
-                
-                page = await context.new_page()
-                city_url = f"{self.base_url}/projects/{city_slug}"
+        cached = self._cached_availability(city_slug)
+        if cached is not None:
+            return cached
+        
+        lock = self._verify_locks.setdefault(city_slug, asyncio.Lock())
+        async with lock:
+            # Another caller may have finished the check while we waited
+            cached = self._cached_availability(city_slug)
+            if cached is not None:
+                return cached
+            
+            try:
+                available = await self._check_city_availability(city_slug)
+            except Exception as e:
+                # Failures aren't cached so the next call retries
+                logger.error(f"Error verifying city {city_slug}: {str(e)}")
+                return False
+            
+            self._verify_cache[city_slug] = (time.monotonic(), available)
+            return available
+    
+    def _cached_availability(self, city_slug: str) -> Optional[bool]:
+        """Cached availability for a slug, or None if missing or expired"""
+        checked_at, available = self._verify_cache.get(city_slug, (0.0, None))
+        if time.monotonic() - checked_at < VERIFY_CACHE_TTL:
+            return available
+        return None
+    
+    async def _check_city_availability(self, city_slug: str) -> bool:
+        """Check a city page for projects, over HTTP first and then in the browser"""
+        city_url = f"{self.base_url}/projects/{city_slug}"
+        
+        # Server-rendered pages can be settled without a browser; the browser
+        # only runs when the answer is still open
+        available = await self._fetch_availability(city_url)
+        if available is not None:
+            return available
+        
+        async with browser_context(
+            self.pool,
+            user_agent=self.config.USER_AGENT,
+            viewport={'width': 1920, 'height': 1080}
+        ) as context:
+            page = await context.new_page()
+            
+            response = await self._goto(page, city_url, wait_until='domcontentloaded')
+            
+            if response.status == 200:
+                # Give client-side rendering a moment to add project cards
+                await self._wait_for_selector(page, _PROJECT_INDICATOR)
                 
-                response = await page.goto(city_url, wait_until='networkidle')
+                # Check if page has projects
+                content = await page.content()
+                soup = BeautifulSoup(content, 'lxml')
                 
-                if response.status == 200:
-                    # Check if page has projects
-                    content = await page.content()
-                    soup = BeautifulSoup(content, 'html.parser')
-                    
-                    # Look for project cards or listings
-                    project_indicators = [
-                        '[data-testid="project-card"]',
-                        '.project-card',
-                        '.project-item',
-                        'a[href*="/project/"]'
-                    ]
-                    
-                    for selector in project_indicators:
-                        if soup.select(selector):
-                            await browser.close()
-                            return True
-                    
-                    # Check if there's a "no projects" message
-                    no_projects_indicators = [
-                        'no projects',
-                        'אין פרויקטים',
-                        'לא נמצאו פרויקטים'
-                    ]
-                    
-                    page_text = soup.get_text().lower()
-                    for indicator in no_projects_indicators:
-                        if indicator in page_text:
-                            await browser.close()
-                            return False
-                    
-                    # If we can't determine, assume it's available
-                    await browser.close()
+                # Look for project cards or listings
+                if soup.select_one(_PROJECT_INDICATOR) is not None:
                     return True
                 
-                await browser.close()
-                return False
+                # Check if there's a "no projects" message
+                page_text = soup.get_text().lower()
+                for indicator in _NO_PROJECTS_INDICATORS:
+                    if indicator in page_text:
+                        return False
                 
-        except Exception as e:
-            logger.error(f"Error verifying city {city_slug}: {str(e)}")
+                # If we can't determine, assume it's available
+                return True
+            
             return False
+    
+    async def _fetch_availability(self, city_url: str) -> Optional[bool]:
+        """Check a city page over plain HTTP, or None if only a browser can tell"""
+        try:
+            response = await self._get_with_retries(city_url)
+        except httpx.HTTPError as e:
+            logger.debug(f"HTTP check failed for {city_url}: {str(e)}")
+            return None
+        
+        status = response.status_code
+        if status == 200:
+            # Project cards may be rendered client-side, so a miss isn't final
+            soup = BeautifulSoup(response.text, 'lxml')
+            return True if soup.select_one(_PROJECT_INDICATOR) is not None else None
+        
+        if status in _BOT_BLOCK_STATUSES or status >= 500:
+            return None
+        
+        # 404/410 and other client errors mean the city page doesn't exist
+        return False
+    
+    async def _get_with_retries(self, url: str) -> httpx.Response:
+        """GET a URL, backing off exponentially on transport errors and 429/5xx"""
+        for attempt in range(self.config.MAX_RETRIES):
+            last_attempt = attempt == self.config.MAX_RETRIES - 1
+            try:
+                await self._throttle(url)
+                response = await self._http.get(url)
+            except httpx.TransportError:
+                if last_attempt:
+                    raise
+            else:
+                if response.status_code not in _RETRY_STATUSES or last_attempt:
+                    return response
+            
+            await asyncio.sleep(_RETRY_BASE_DELAY * 2 ** attempt)
+        
+        # MAX_RETRIES of zero still makes one request
+        await self._throttle(url)
+        return await self._http.get(url)
+    
+    async def _goto(self, page, url: str, **options):
+        """Navigate the page once the host's rate limit allows"""
+        await self._throttle(url)
+        return await page.goto(url, **options)
+    
+    async def _throttle(self, url: str):
+        """Wait for a request slot on the URL's host"""
+        await self._rate_limiter.acquire(urlparse(url).netloc)
+    
+    async def verify_cities(self, city_slugs: List[str]) -> Dict[str, bool]:
+        """Verify several cities concurrently, returning availability by slug"""
+        semaphore = asyncio.BoundedSemaphore(self.config.SCRAPE_CONCURRENCY)
+        
+        async def verify_one(city_slug: str) -> bool:
+            async with semaphore:
+                return await self.verify_city_availability(city_slug)
+        
+        results = await asyncio.gather(
+            *(verify_one(city_slug) for city_slug in city_slugs),
+            return_exceptions=True
+        )
+        
+        availability = {}
+        for city_slug, result in zip(city_slugs, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error verifying city {city_slug}: {str(result)}")
+                result = False
+            availability[city_slug] = result
+        
+        return availability
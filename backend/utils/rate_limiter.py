@@ -0,0 +1,36 @@
+import asyncio
+import time
+from typing import Dict
+
+class HostRateLimiter:
+    """Token bucket per host, so concurrent tasks share each site's request budget (0 = unthrottled)"""
+
+    def __init__(self, rate_per_sec: float):
+        if rate_per_sec < 0:
+            raise ValueError(f"rate_per_sec must be positive, or 0 to disable throttling, got {rate_per_sec}")
+        self.rate = rate_per_sec
+        # Allow a burst of up to one second's worth of requests
+        self.capacity = max(rate_per_sec, 1.0)
+        self._tokens: Dict[str, float] = {}
+        self._last: Dict[str, float] = {}
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, host: str):
+        """Wait until a request to the host is allowed"""
+        if not self.rate:
+            return
+
+        async with self._lock:
+            now = time.monotonic()
+            tokens = self._tokens.get(host, self.capacity)
+            elapsed = now - self._last.get(host, now)
+            tokens = min(self.capacity, tokens + elapsed * self.rate)
+
+            # Take the token now, even if it goes negative, so later callers
+            # queue up behind this one instead of racing for the same refill
+            self._tokens[host] = tokens - 1
+            self._last[host] = now
+            wait = (1 - tokens) / self.rate if tokens < 1 else 0.0
+
+        if wait > 0:
+            await asyncio.sleep(wait)
@@ -3,86 +3,119 @@
 Test script to verify the Market Survey System is working correctly
 """
 
+import asyncio
 import subprocess
 import time
-import requests
+import httpx
 import sys
 import os
 
-def test_backend():
+# Backend endpoints to check, with the name used in the report
+BACKEND_ENDPOINTS = [
+    ("/", "Root"),
+    ("/api/projects", "Projects"),
+    ("/api/status", "Status"),
+    ("/api/ai-insights", "AI insights"),
+]
+
+# AI insights wait on an LLM round trip, which can take well over 10 seconds
+ENDPOINT_TIMEOUTS = {
+    "/api/ai-insights": httpx.Timeout(10, read=60),
+}
+
+async def test_backend():
     """Test backend API endpoints"""
     print("Testing backend API...")
     
     base_url = "http://localhost:8000"
     
     try:
-        # Test root endpoint
-        response = requests.get(f"{base_url}/")
-        if response.status_code == 200:
-            print("✅ Root endpoint working")
-        else:
-            print("❌ Root endpoint failed")
-            return False
+        # Hit every endpoint at once, then report in the listed order
+        async with httpx.AsyncClient(base_url=base_url, timeout=10) as client:
+            responses = await asyncio.gather(
+                *(client.get(path, timeout=ENDPOINT_TIMEOUTS.get(path, httpx.USE_CLIENT_DEFAULT))
+                  for path, _ in BACKEND_ENDPOINTS),
+                return_exceptions=True
+            )
         
-        # Test projects endpoint
-        response = requests.get(f"{base_url}/api/projects")
-        if response.status_code == 200:
-            print("✅ Projects endpoint working")
-        else:
-            print("❌ Projects endpoint failed")
-            return False
+        ok = True
+        for (_, name), response in zip(BACKEND_ENDPOINTS, responses):
+            if isinstance(response, httpx.ConnectError):
+                print("❌ Cannot connect to backend. Make sure it's running on port 8000")
+                return False
+            if isinstance(response, Exception):
+                print(f"❌ {name} endpoint failed: {response}")
+                ok = False
+            elif response.status_code == 200:
+                print(f"✅ {name} endpoint working")
+            else:
+                print(f"❌ {name} endpoint failed")
+                ok = False
         
-        # Test status endpoint
-        response = requests.get(f"{base_url}/api/status")
-        if response.status_code == 200:
-            print("✅ Status endpoint working")
-        else:
-            print("❌ Status endpoint failed")
-            return False
+        return ok
         
-        # Test AI insights endpoint
-        response = requests.get(f"{base_url}/api/ai-insights")
-        if response.status_code == 200:
-            print("✅ AI insights endpoint working")
-        else:
-            print("❌ AI insights endpoint failed")
-            return False
-        
-        return True
-        
-    except requests.exceptions.ConnectionError:
-        print("❌ Cannot connect to backend. Make sure it's running on port 8000")
-        return False
     except Exception as e:
         print(f"❌ Backend test failed: {e}")
         return False
 
-def test_frontend():
+async def test_frontend():
     """Test frontend accessibility"""
     print("Testing frontend...")
     
     try:
-        response = requests.get("http://localhost:3000")
+        async with httpx.AsyncClient(timeout=10) as client:
+            response = await client.get("http://localhost:3000")
         if response.status_code == 200:
             print("✅ Frontend accessible")
             return True
         else:
             print("❌ Frontend not accessible")
             return False
-    except requests.exceptions.ConnectionError:
+    except httpx.ConnectError:
         print("❌ Cannot connect to frontend. Make sure it's running on port 3000")
         return False
     except Exception as e:
         print(f"❌ Frontend test failed: {e}")
         return False
 
+async def wait_ready(url, timeout=30):
+    """Poll a URL with exponential backoff until it answers or the timeout passes"""
+    deadline = time.monotonic() + timeout
+    delay = 0.1
+    
+    async with httpx.AsyncClient(timeout=5) as client:
+        while True:
+            try:
+                response = await client.get(url)
+                if response.status_code < 500:
+                    return True
+            except httpx.HTTPError:
+                pass
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * 2, 2.0)
+
+async def run_tests():
+    """Run the backend and frontend checks concurrently"""
+    # Servers may still be starting, so give them a chance to come up;
+    # the checks below report whichever one never did
+    print("Waiting for backend and frontend to start...")
+    await asyncio.gather(
+        wait_ready("http://localhost:8000/"),
+        wait_ready("http://localhost:3000")
+    )
+    
+    return await asyncio.gather(test_backend(), test_frontend())
+
 def main():
     """Main test function"""
     print("🧪 Testing Market Survey System...")
     print("=" * 50)
     
-    backend_ok = test_backend()
-    frontend_ok = test_frontend()
+    backend_ok, frontend_ok = asyncio.run(run_tests())
     
     print("=" * 50)
     